@@ -1,8 +1,62 @@
+import argparse
+import array
+import asyncio
+import concurrent.futures
+import hashlib
+import heapq
 import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+__all__ = [
+    "ExpressionError", "Node", "constructTree", "convert", "cleanBrackets", "compileTree",
+    "compare", "iterFailures", "truthTable", "truthTables", "equivalentGroups", "evalBatch", "satisfy", "countModels", "models", "simplify", "fingerprint", "fingerprintBuckets",
+    "StepChecker", "GrayEvaluator", "AIG", "BDD", "SATSolver", "ExpressionCache", "Cache", "Instrumentation", "Stats", "TableStore", "useStore", "Program", "runJob",
+    "runBatch", "serve", "startServer", "request", "repl", "main",
+]
+
+try:
+    # NumPy is only needed for batch evaluation
+    import numpy
+except ImportError:
+    numpy = None
 
 # Input set for later
 PossibleInputs = set("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
 
+# Streamed truth tables are evaluated 2^ChunkBits rows at a time
+ChunkBits = 16
+
+# Truth tables of up to this many inputs are kept in the expression cache
+CachedTableBits = 20
+
+# Random rows evaluated for a simulation fingerprint
+SimulationRows = 4096
+
+# Statements simulation can't refute are checked row by row up to this many
+# inputs and symbolically past it
+ExhaustiveBits = 24
+
+# Decision diagrams are sifted to a better input order once they grow past this
+# many nodes
+SiftNodes = 1 << 16
+
+# Node.eval recurses this many levels deep, deeper subtrees are walked with an
+# explicit stack so a deep tree never causes a RecursionError
+EvalDepth = 100
+
+# Longest line the server reads, a longer line gets an error instead of a result
+ServerLineBytes = 1 << 26
+
 def convert(statement:str):
     
     '''
@@ -11,6 +65,8 @@ def convert(statement:str):
     to manage when constructing the operator tree
     '''
     
+    start = time.perf_counter() if Stats.enabled else None
+    
     # Reconstruction of a statement should never influence the first character
     newStatement = statement[0]
     
@@ -22,6 +78,9 @@ def convert(statement:str):
                 # * should be injected
                 newStatement+="*"
         newStatement+=char
+    
+    if start != None:
+        Stats.time("convert", start)
     return newStatement
                 
 def constructInputsDict(statement:str):
@@ -48,29 +107,6 @@ def constructInputsDict(statement:str):
     # Return the constructed dictionary
     return InputDict
 
-def getFreeOperator(statement:str, operator):
-    
-    '''
-    Calling for an operator that is free means calling for an operator that is not encased
-    in any sets of brackets. In doing this it allows for handing of brackets and nested 
-    brackets without a dedicated node.
-    '''
-    
-    depth = 0 # Depth indicates how many brackets are currently encasing the index
-    index = None # If not found "free" then none will be returned
-    for i,val in enumerate(statement):
-        if val == "(": # handling depth
-            depth+=1
-        elif val == ")":
-            depth-=1
-        elif val==operator and depth == 0:
-            # Instance where the operator found is free
-            index = i
-            break
-    
-    # Return the found index or None if not found
-    return index
-        
 def cleanBrackets(statement:str):
     '''
     Clean brackets function will remove any unrequired brackets
@@ -99,48 +135,133 @@ def cleanBrackets(statement:str):
             
     return statement
     
+class ExpressionError(ValueError):
+    
+    '''
+    Raised when a boolean expression can't be parsed, position is the index of
+    the offending character within the expression.
+    '''
+    
+    def __init__(self, message:str, statement:str, position:int):
+        super().__init__("{} at position {}".format(message, position))
+        self.statement = statement
+        self.position = position
+
+# Operators by how tightly they bind, ~ negates the operator after it (~* is
+# nand, ~+ nor and ~^ xnor) and binds like it
+Precedence = {"+":1, "~+":1, "^":2, "~^":2, "*":3, "~*":3}
+
 def constructTree(statement:str):
     
     '''
-    Tree construction is a recursive operation that constructs an operator tree from the
-    given expression. Function will first remove redundant brackets (if any) and then 
-    locate the first, highest priority node that is free. Then it will call itself
-    on the left and right expressions. Any expression that is a length of 1 is a fully
-    constructed branch.
+    Tree construction parses the expression in a single left to right pass. Operands
+    and operators are pushed onto stacks and an operator is only reduced into a node
+    once an operator that binds as or more loosely (or the end of a bracket) is met,
+    chains of the same operator are flattened so A+B+C is one or node with three
+    children. Implicit and between adjacent terms, ie AB or A(B+C), is inserted as the
+    expression is read and the not operator is applied to the term directly before it.
+    Xor (^) binds between and and or, the negated operators nand (~*), nor (~+) and
+    xnor (~^) bind like the operator they negate and become a not of it, so A~*B is
+    (AB)'. Whitespace is ignored. An ExpressionError is raised for any expression that
+    can't be parsed.
     '''
     
-    # Remove redundant brackets from expression, ie (A+B) is A+B
-    statement = cleanBrackets(statement)
+    start = time.perf_counter() if Stats.enabled else None
     
-    if len(statement) == 1:
-        # Length of 1 means that the branch is full evaluated
-        return Node("v", statement)
+    operands = []
+    operators = [] # Pending operators along with their positions
     
-    # Order of operations is to be taken backwards to ensure appropriate
-    # construction/evaluation of the tree
+    def reduce():
+        # Combine the top two operands with the top operator, a chain of the
+        # same operator is flattened into one node with every term as a child
+        operator, position = operators.pop()
+        right = operands.pop()
+        left = operands.pop()
+        base = operator[-1]
+        
+        if left.operator != base:
+            left = Node(base, [left])
+        if right.operator == base:
+            left.Children.extend(right.Children)
+        else:
+            left.Children.append(right)
+        
+        if operator[0] == "~":
+            left = Node("'", left)
+        operands.append(left)
     
-    # Call for the index of the first or operator
-    OrIndex = getFreeOperator(statement, "+")
+    # Previous token decides if an operand is expected next and where
+    # implicit and operators belong
+    expectOperand = True
+    negated = None # Position of a ~ waiting for its operator
     
-    if OrIndex != None:
-        # If the or index was found then we return a node and set the children
-        # to trees that are to be constructed from the split statement
-        return Node("+", [constructTree(statement[:OrIndex]), constructTree(statement[OrIndex+1:])])
+    for i,char in enumerate(statement):
+        if char.isspace():
+            continue
+        
+        if negated != None and char not in "*+^":
+            raise ExpressionError("Expected *, + or ^ after '~'", statement, i)
+        
+        if char in PossibleInputs or char in "01(":
+            if not expectOperand:
+                # Adjacent terms are anded together
+                while operators and operators[-1][0] != "(" and Precedence[operators[-1][0]] >= Precedence["*"]:
+                    reduce()
+                operators.append(("*", i))
+            
+            if char == "(":
+                operators.append(("(", i))
+                expectOperand = True
+            else:
+                operands.append(Node("v", char))
+                expectOperand = False
+        
+        elif char == ")":
+            if expectOperand:
+                raise ExpressionError("Expected an operand before ')'", statement, i)
+            while operators and operators[-1][0] != "(":
+                reduce()
+            if not operators:
+                raise ExpressionError("Unmatched ')'", statement, i)
+            operators.pop()
+        
+        elif char == "'":
+            if expectOperand:
+                raise ExpressionError("Expected an operand before \"'\"", statement, i)
+            # Not binds tightest so it applies straight to the last term
+            operands.append(Node("'", operands.pop()))
+        
+        elif char == "~":
+            if expectOperand or negated != None:
+                raise ExpressionError("Expected an operand before '~'", statement, i)
+            negated = i
+        
+        elif char in Precedence:
+            if expectOperand:
+                raise ExpressionError("Expected an operand before '{}'".format(char), statement, i)
+            if negated != None:
+                char, i = "~" + char, negated
+                negated = None
+            # Operators binding as tight or tighter are reduced first
+            while operators and operators[-1][0] != "(" and Precedence[operators[-1][0]] >= Precedence[char]:
+                reduce()
+            operators.append((char, i))
+            expectOperand = True
+        
+        else:
+            raise ExpressionError("Unexpected character '{}'".format(char), statement, i)
     
-    # Repeat the process for other operators
-    AndIndex = getFreeOperator(statement, "*")
-    if AndIndex != None:
-        return Node("*", [constructTree(statement[:AndIndex]), constructTree(statement[AndIndex+1:])])
+    if expectOperand or negated != None:
+        raise ExpressionError("Unexpected end of expression", statement, len(statement))
     
-    NotIndex = getFreeOperator(statement, "'")
-    if NotIndex != None:
-        # In the instance of a not operator it will only have one child
-        # of which will be entirely to the left due to order of node
-        # construction
-        return Node("'", constructTree(statement[:-1]))
+    while operators:
+        if operators[-1][0] == "(":
+            raise ExpressionError("Unmatched '('", statement, operators[-1][1])
+        reduce()
     
-    print("end?")
-    print(statement)
+    if start != None:
+        Stats.time("constructTree", start)
+    return operands[0]
         
 # Node class will be used to structure the tree
 class Node():
@@ -148,222 +269,3803 @@ class Node():
         # One global node with a defined operator
         self.operator = Operator        
         self.Children = Children
+        
+        # Inputs the node depends on, worked out when first needed
+        self.support = None
     
     def getChildren(self):
         return self.Children
     
     def setChildren(self, Children:list):
         self.Children = Children
+        self.support = None
     
     def getOperator(self):
         return self.operator
     
+    def getSupport(self):
+        # The set of inputs the node depends on, cached on every node of the
+        # subtree until its children are set again
+        if self.support == None:
+            for node in postOrder(self):
+                if node.support != None:
+                    continue
+                if node.operator == "v":
+                    node.support = frozenset() if node.Children.isdigit() else frozenset(node.Children)
+                else:
+                    node.support = frozenset().union(*[child.getSupport() for child in nodeChildren(node)])
+        return self.support
+    
     def eval(self, inputs:dict):
-        # Evaluation is a recursive operation
         
-        # Or operator
-        if self.operator == "+":
-            # Start with false to not influence outcome
-            val = False
+        '''
+        Evaluation recurses through the top EvalDepth levels of the tree, which is
+        the cheapest walk for the shallow trees most statements give, and hands any
+        deeper subtree to evalStack. And/or nodes stop at the first child that
+        decides them, ie an or node stops at a true child.
+        '''
+        
+        if Stats.enabled:
+            return self.evalCounted(inputs)
+        return self.evalRecursive(inputs, 0)
+    
+    def evalRecursive(self, inputs:dict, depth:int):
+        # Recursive evaluation of a node depth levels below where eval started
+        operator = self.operator
+        if operator == "v":
+            if self.Children.isdigit():
+                return int(self.Children)
+            return int(inputs[self.Children])
+        
+        if depth == EvalDepth:
+            return self.evalStack(inputs)
+        depth += 1
+        
+        if operator == "'":
+            return 1 - self.Children.evalRecursive(inputs, depth)
+        
+        if operator == "^":
+            val = 0
             for child in self.Children:
-                # Iterate through children
-                if type(child) == Node:
-                    # Another node will be evaluated
-                    val = val or child.eval(inputs)
+                val ^= child.evalRecursive(inputs, depth)
+            return val
+        
+        # An or is decided by a true child and an and by a false one
+        deciding = 1 if operator == "+" else 0
+        for child in self.Children:
+            if child.evalRecursive(inputs, depth) == deciding:
+                return deciding
+        return 1 - deciding
+    
+    def evalStack(self, inputs:dict):
+        
+        '''
+        Evaluation with an explicit stack rather than recursion, so the depth of
+        the tree never causes a RecursionError.
+        '''
+        
+        # Each frame is a node and the index of the next child to evaluate,
+        # val holds the value of the last node to finish
+        stack = [[self, 0]]
+        val = None
+        
+        while stack:
+            frame = stack[-1]
+            node, index = frame
+            
+            if type(node) != Node:
+                # Node is a input
+                val = int(inputs[node])
+                stack.pop()
+            
+            elif node.operator == "v":
+                # The value of the child
+                if node.Children.isdigit():
+                    val = int(node.Children)
                 else:
-                    # Node is a input
-                    val = val or inputs[child]
+                    val = int(inputs[node.Children])
+                stack.pop()
             
-            return int(val) 
-        
-        # Repeat process for other operators
-        elif self.operator == "*":
-            val = True
-            for child in self.Children:
-                if type(child) == Node:
-                    val = val and child.eval(inputs)
+            elif node.operator == "'":
+                # Not should only ever have one child
+                if index == 0:
+                    frame[1] = 1
+                    stack.append([node.Children, 0])
+                else:
+                    val = int(not val)
+                    stack.pop()
+            
+            elif node.operator != "^":
+                # An or is decided by a true child and an and by a false one
+                deciding = 1 if node.operator == "+" else 0
+                if index > 0 and val == deciding:
+                    stack.pop()
+                elif index == len(node.Children):
+                    val = 1 - deciding
+                    stack.pop()
+                else:
+                    frame[1] = index + 1
+                    stack.append([node.Children[index], 0])
+            
+            else:
+                # Xor needs every child, the frame's index also holds the
+                # parity so far in its lowest bit
+                if index > 0:
+                    index ^= val
+                if index >> 1 == len(node.Children):
+                    val = index & 1
+                    stack.pop()
                 else:
-                    val = val and inputs[child]
+                    frame[1] = index + 2
+                    stack.append([node.Children[index >> 1], 0])
+        
+        return val
     
-            return int(val)
+    def evalCounted(self, inputs:dict):
         
-        elif self.operator == "'":
-            # Not should only ever have one child
-            return int(not self.Children.eval(inputs))
+        '''
+        The same walk as eval that also counts every node evaluated by operator,
+        kept separate so eval pays nothing for it while instrumentation is off.
+        In sampling mode one call in Stats.SampleEvery also times each subtree
+        from when its node is reached until its value is known.
+        '''
         
-        elif self.operator == "v":
-            # The value of the child
-            if self.Children.isdigit():
-                return int(self.Children)
+        start = time.perf_counter()
+        counts = Stats.evals
+        sampling = Stats.sampling and Stats.tick()
+        clock = time.perf_counter
+        
+        # Frames also hold when their node was reached while sampling
+        stack = [[self, 0, clock() if sampling else None]]
+        val = None
+        
+        while stack:
+            frame = stack[-1]
+            node, index, reached = frame[0], frame[1], frame[2]
+            done = True
+            
+            if type(node) != Node:
+                # Node is a input
+                counts["v"] = counts.get("v", 0) + 1
+                val = int(inputs[node])
+                stack.pop()
+                continue
+            
+            if index == 0:
+                counts[node.operator] = counts.get(node.operator, 0) + 1
+            
+            if node.operator == "v":
+                if node.Children.isdigit():
+                    val = int(node.Children)
+                else:
+                    val = int(inputs[node.Children])
+            
+            elif node.operator == "'":
+                if index == 0:
+                    frame[1] = 1
+                    stack.append([node.Children, 0, clock() if sampling else None])
+                    done = False
+                else:
+                    val = int(not val)
+            
+            elif node.operator == "^":
+                if index == 0:
+                    frame.append(0)
+                else:
+                    frame[3] ^= val
+                if index == len(node.Children):
+                    val = frame[3]
+                else:
+                    frame[1] = index + 1
+                    stack.append([node.Children[index], 0, clock() if sampling else None])
+                    done = False
+            
+            else:
+                deciding = 1 if node.operator == "+" else 0
+                if index > 0 and val == deciding:
+                    pass
+                elif index == len(node.Children):
+                    val = 1 - deciding
+                else:
+                    frame[1] = index + 1
+                    stack.append([node.Children[index], 0, clock() if sampling else None])
+                    done = False
+            
+            if done:
+                if sampling:
+                    Stats.sample(node, clock() - reached)
+                stack.pop()
+        
+        Stats.time("eval", start)
+        return val
+    
+    def evalBatch(self, columns:dict, rows:int):
+        # Batch evaluation, every input is a boolean column holding its value
+        # for each row of the batch so operators are applied column-wise
+        
+        values = {}
+        for node in postOrder(self):
+            if node.operator == "+":
+                val = numpy.zeros(rows, dtype=bool)
+                for child in node.Children:
+                    val |= values.pop(id(child))
+            
+            elif node.operator == "*":
+                val = numpy.ones(rows, dtype=bool)
+                for child in node.Children:
+                    val &= values.pop(id(child))
+            
+            elif node.operator == "^":
+                val = numpy.zeros(rows, dtype=bool)
+                for child in node.Children:
+                    val ^= values.pop(id(child))
+            
+            elif node.operator == "'":
+                val = ~values.pop(id(node.Children))
+            
+            elif node.Children.isdigit():
+                val = numpy.full(rows, node.Children == "1")
             else:
-                return int(inputs[self.Children])
+                val = columns[node.Children]
+            
+            values[id(node)] = val
+        
+        return values[id(self)]
+
+def nodeChildren(node:Node):
+    # Not nodes hold their only child directly rather than in a list
+    if node.operator == "'":
+        return [node.Children]
+    elif node.operator == "v":
+        return []
+    return node.Children
 
-def compare(statement1:str, statement2:str, printFailures=True):
+def postOrder(tree:Node):
     
     '''
-    Compare function will compare two inputted statements, generate a truth table for each
-    and verify if the statements produce the same output(s) for their corresponding input(s).
+    Post-order walk of a tree, every node is yielded after all of its children.
+    The walk uses an explicit stack so the depth of the tree is not limited by
+    recursion.
     '''
     
-    # Construct an input dictionary that is not populated by the user
-    inputChars = []
+    stack = [(tree, False)]
+    while stack:
+        node, visited = stack.pop()
+        if visited or node.operator == "v":
+            yield node
+        else:
+            stack.append((node, True))
+            for child in reversed(nodeChildren(node)):
+                stack.append((child, False))
+
+def treeText(tree:Node):
+    # A tree written back out as an expression, brackets are only added where
+    # precedence needs them
+    texts = {}
+    for node in postOrder(tree):
+        if node.operator == "v":
+            text = node.Children
+        elif node.operator == "'":
+            text = texts[id(node.Children)]
+            text = (text if node.Children.operator in ["v", "'"] else "(" + text + ")") + "'"
+        else:
+            parts = []
+            for child in node.Children:
+                text = texts[id(child)]
+                if child.operator in Precedence and Precedence[child.operator] < Precedence[node.operator]:
+                    text = "(" + text + ")"
+                parts.append(text)
+            text = node.operator.join(parts)
+        texts[id(node)] = text
+    return texts[id(tree)]
+
+def compileTree(tree:Node, inputChars:list):
+    
+    '''
+    Compiling a tree turns it into a single generated Python function that takes
+    the inputs as positional arguments in the order of inputChars. The function
+    body is straight-line code with one line per operator input, constants are
+    folded away during generation (a constant 1 into a xor inverts it) and and/or
+    nodes skip the rest of their children once a constant decides them. Not is
+    computed against the mask argument, with the default mask of 1 the function
+    evaluates one row and with a table mask and input patterns it evaluates every
+    row at once.
+    '''
+    
+    start = time.perf_counter() if Stats.enabled else None
+    
+    # Nodes reached more than once keep their value for every parent
+    parents = {}
+    for node in postOrder(tree):
+        for child in nodeChildren(node):
+            parents[id(child)] = parents.get(id(child), 0) + 1
+    shared = {}
+    
+    lines = []
+    names = [] # Temporaries free to be reused
+    pinned = set() # Temporaries holding a shared node's value
+    count = 0
+    
+    def owned(val):
+        # Temporaries that nothing else reads can be updated in place
+        return type(val) == str and val[0] == "t" and val not in pinned
+    
+    def temporary():
+        nonlocal count
+        if names:
+            return names.pop()
+        count += 1
+        return "t{}".format(count - 1)
+    
+    # Frames are a node, the index of its next child and its value so far,
+    # val is a folded constant or the name holding the last finished node
+    stack = [[tree, 0, None]]
+    val = None
+    
+    while stack:
+        frame = stack[-1]
+        node, index, acc = frame[0], frame[1], frame[2]
+        done = True
         
-    # statement1 is assumed to have more or equivalent inputs than statement2
-    for char in statement1:
-        if char not in inputChars and char in PossibleInputs:
-            inputChars.append(char) 
+        if index == 0 and id(node) in shared:
+            val = shared[id(node)]
         
-    # Sort to make sure inputs are kept inline
-    inputChars.sort()
+        elif node.operator == "v":
+            if node.Children.isdigit():
+                val = int(node.Children)
+            elif node.Children in inputChars:
+                val = node.Children
+            else:
+                raise KeyError(node.Children)
+        
+        elif node.operator == "'":
+            if index == 0:
+                frame[1] = 1
+                stack.append([node.Children, 0, None])
+                done = False
+            elif type(val) == int:
+                val = 1 - val
+            else:
+                name = val if owned(val) else temporary()
+                lines.append("{} = mask ^ {}".format(name, val))
+                val = name
+        
+        elif node.operator == "^":
+            # Constant children are folded into the parity kept in the frame
+            if index == 0:
+                frame.append(0)
+            elif type(val) == int:
+                frame[3] ^= val
+            elif acc == None:
+                acc = val
+            elif owned(acc):
+                lines.append("{} ^= {}".format(acc, val))
+                if owned(val):
+                    names.append(val)
+            elif owned(val):
+                lines.append("{} ^= {}".format(val, acc))
+                acc = val
+            else:
+                name = temporary()
+                lines.append("{} = {} ^ {}".format(name, acc, val))
+                acc = name
+            frame[2] = acc
+            
+            if index < len(node.Children):
+                frame[1] = index + 1
+                stack.append([node.Children[index], 0, None])
+                done = False
+            elif acc == None:
+                val = frame[3]
+            elif frame[3] == 1:
+                name = acc if owned(acc) else temporary()
+                lines.append("{} = mask ^ {}".format(name, acc))
+                val = name
+            else:
+                val = acc
+        
+        else:
+            absorbing = 1 if node.operator == "+" else 0
+            symbol = "|" if node.operator == "+" else "&"
+            
+            if index > 0:
+                # Fold the child that just finished into the node's value
+                if val == absorbing:
+                    if owned(acc):
+                        names.append(acc)
+                    acc = absorbing
+                elif val == 1 - absorbing:
+                    pass
+                elif acc == None:
+                    acc = val
+                elif owned(acc):
+                    lines.append("{} {}= {}".format(acc, symbol, val))
+                    if owned(val):
+                        names.append(val)
+                elif owned(val):
+                    lines.append("{} {}= {}".format(val, symbol, acc))
+                    acc = val
+                else:
+                    name = temporary()
+                    lines.append("{} = {} {} {}".format(name, acc, symbol, val))
+                    acc = name
+                frame[2] = acc
+            
+            if acc == absorbing or index == len(node.Children):
+                val = 1 - absorbing if acc == None else acc
+            else:
+                frame[1] = index + 1
+                stack.append([node.Children[index], 0, None])
+                done = False
         
-    # Construct trees
-    statement1 = constructTree(convert(statement1))
-    statement2 = constructTree(convert(statement2))
+        if done:
+            if parents.get(id(node), 0) > 1 and id(node) not in shared:
+                if owned(val):
+                    pinned.add(val)
+                shared[id(node)] = val
+            stack.pop()
     
-    # A list of combination(s)  
-    combis = [list(i) for i in itertools.product([0, 1], repeat=len(inputChars))]
+    if type(val) == int:
+        val = "mask" if val == 1 else "0"
     
-    # init failure count
-    fails = 0
+    source = "def evaluate({}):\n{}    return {}\n".format(
+        ", ".join(inputChars + ["mask=1"]), "".join(["    " + line + "\n" for line in lines]), val)
     
-    if printFailures == True:    
-        print("Testing...")
+    namespace = {}
+    exec(source, namespace)
+    function = namespace["evaluate"]
+    function.source = source
+    
+    if start != None:
+        Stats.time("compile", start)
+    return function
+
+class Program():
+    
+    '''
+    Compact form of a tree, the tree lowered to a postfix instruction stream. Each
+    instruction is an opcode byte in ops and an operand in args, an input slot,
+    a constant or the number of values an and/or/xor combines. Inputs are interned to
+    slots so a program holds no per node objects at all.
+    '''
+    
+    # Opcodes
+    INPUT, CONST, NOT, AND, OR, XOR = range(6)
+    
+    def __init__(self, ops:bytes, args:array.array, inputs:list):
+        self.ops = ops
+        self.args = args
+        self.inputs = inputs
+    
+    def __len__(self):
+        return len(self.ops)
+    
+    @classmethod
+    def fromNode(cls, tree:Node, inputChars:list=None):
+        # Lowers a tree, inputs are given slots in the order of inputChars
+        inputs = list(inputChars) if inputChars != None else []
+        slots = {char:i for i,char in enumerate(inputs)}
+        ops = bytearray()
+        args = array.array("I")
         
-    # Iterate through combinations
-    for comb in combis:
-        InputDict = {}
+        for node in postOrder(tree):
+            if node.operator == "v":
+                if node.Children.isdigit():
+                    ops.append(cls.CONST)
+                    args.append(int(node.Children))
+                else:
+                    if node.Children not in slots:
+                        slots[node.Children] = len(inputs)
+                        inputs.append(node.Children)
+                    ops.append(cls.INPUT)
+                    args.append(slots[node.Children])
+            elif node.operator == "'":
+                ops.append(cls.NOT)
+                args.append(1)
+            else:
+                ops.append({"+":cls.OR, "*":cls.AND, "^":cls.XOR}[node.operator])
+                args.append(len(node.Children))
         
-        # Construct input dictionary for combination
-        for i,val in enumerate(inputChars):
-            InputDict[val] = comb[i]
-                
-        # Compare statements for generated input
-        if statement1.eval(InputDict) != statement2.eval(InputDict):
-            # failed, notify users of failure values
-            fails+=1
-            if printFailures == True:
-                print("Failure with parameters:")
-                print(" ".join([char+"="+str(InputDict[char]) for char in InputDict.keys()]))
-            
-    # Testing complete, notify failure count or if success
-    if fails == 0:
-        if printFailures == True:
-            print("Statements are identical")
-        return True
-    else:
-        if printFailures == True:
-            print("Statements are NOT identical")
-            print("Failures encountered: {0:<5} ".format(fails))
-        return False
-
-def truthTable(statement:str):
+        return cls(bytes(ops), args, inputs)
     
-    inputChars = []
+    def toNode(self):
+        # Rebuilds the tree the program was lowered from
+        stack = []
+        for op, arg in zip(self.ops, self.args):
+            if op == self.INPUT:
+                stack.append(Node("v", self.inputs[arg]))
+            elif op == self.CONST:
+                stack.append(Node("v", str(arg)))
+            elif op == self.NOT:
+                stack.append(Node("'", stack.pop()))
+            else:
+                children = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                stack.append(Node({self.OR:"+", self.AND:"*", self.XOR:"^"}[op], children))
+        return stack[0]
     
-    # statement1 is assumed to have more or equivalent inputs than statement2
-    for char in statement:
-        if char not in inputChars and char in PossibleInputs:
-            inputChars.append(char) 
+    def eval(self, values:list, mask=1):
         
-    # Sort to make sure inputs are kept inline
-    inputChars.sort()
+        '''
+        Runs the program over a value stack. Values are given per input slot, 0/1
+        for a single row or bit-parallel patterns along with the table mask for
+        every row at once.
+        '''
+        
+        stack = []
+        push = stack.append
+        INPUT, CONST, NOT, AND, XOR = self.INPUT, self.CONST, self.NOT, self.AND, self.XOR
+        
+        for op, arg in zip(self.ops, self.args):
+            if op == INPUT:
+                push(values[arg])
+            elif op == CONST:
+                push(mask if arg else 0)
+            elif op == NOT:
+                stack[-1] ^= mask
+            else:
+                start = len(stack) - arg
+                val = stack[start]
+                if op == AND:
+                    for other in stack[start + 1:]:
+                        val &= other
+                elif op == XOR:
+                    for other in stack[start + 1:]:
+                        val ^= other
+                else:
+                    for other in stack[start + 1:]:
+                        val |= other
+                del stack[start:]
+                push(val)
+        
+        return stack[0]
     
-    statement = constructTree(statement)
+    def memory(self):
+        # Bytes held by the program's buffers
+        return sys.getsizeof(self.ops) + sys.getsizeof(self.args) + sys.getsizeof(self.inputs)
+
+def treeMemory(tree:Node):
+    # Bytes held by a tree's nodes, their attribute dictionaries and child lists
+    total = 0
+    for node in postOrder(tree):
+        total += sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+        if type(node.Children) == list:
+            total += sys.getsizeof(node.Children)
+    return total
+
+def memoryReport(statement:str):
     
-    combis = [list(i) for i in itertools.product([0, 1], repeat=len(inputChars))]
+    '''
+    Prints the memory per node of a statement as a tree of Nodes and as a compact
+    program. Returns the bytes of each.
+    '''
     
-    print(*inputChars,"|","X")
+    tree = cachedTree(statement)
+    program = Program.fromNode(tree, statementInputs(statement))
+    nodes = len(program)
     
-    for comb in combis:
-        InputDict = {}
-        
-        # Construct input dictionary for combination
-        for i,val in enumerate(inputChars):
-            InputDict[val] = comb[i]
-            
-        print(*comb,"|",statement.eval(InputDict))
-            
-# Primary loop
-run = True
+    treeBytes = treeMemory(tree)
+    programBytes = program.memory()
+    
+    print("Nodes:   {}".format(nodes))
+    print("Tree:    {0} bytes ({1:.1f} per node)".format(treeBytes, treeBytes / nodes))
+    print("Program: {0} bytes ({1:.1f} per node)".format(programBytes, programBytes / nodes))
+    
+    return treeBytes, programBytes
+
+def inputPatterns(inputChars:list):
+    
+    '''
+    Input patterns are the bit-parallel form of the truth table inputs. Row r
+    of the table is stored in bit r of an integer, rows are ordered the same
+    way as itertools.product so the first input changes the slowest. Returns
+    a dictionary of input patterns along with the mask covering every row.
+    '''
+    
+    count = len(inputChars)
+    size = 1 << count
+    patterns = {}
+    
+    for i,char in enumerate(inputChars):
+        # Each input is a block of zeros followed by a block of ones, repeated
+        # until every row of the table has been covered
+        block = 1 << (count - 1 - i)
+        pattern = ((1 << block) - 1) << block
+        length = block * 2
+        while length < size:
+            pattern |= pattern << length
+            length *= 2
+        patterns[char] = pattern
+    
+    return patterns, (1 << size) - 1
+
+def rowValues(row:int, count:int):
+    # The input values of a row of the truth table, first input first
+    return [(row >> (count - 1 - i)) & 1 for i in range(count)]
+
+def tableBits(tree:Node, inputChars:list):
+    # The full truth table of a tree as a bit-parallel table
+    patterns, mask = inputPatterns(inputChars)
+    function = compileTree(tree, inputChars)
+    args = [patterns[char] for char in inputChars]
+    
+    if not Stats.enabled:
+        return function(*args, mask=mask)
+    
+    start = time.perf_counter()
+    table = function(*args, mask=mask)
+    Stats.evaluated([tree], inputChars, args, mask, start)
+    return table
+
+def shardInputs(inputChars:list, shardBits:int, prefix:int):
+    
+    '''
+    Inputs for one shard of the truth table, the rows where the first shardBits
+    inputs are fixed to the bits of prefix. The fixed inputs are constant across
+    the shard and the rest are bit-parallel patterns, so the shard's rows are a
+    contiguous block of the full table. Returns the input values in order along
+    with the mask of the shard.
+    '''
+    
+    patterns, mask = inputPatterns(inputChars[shardBits:])
+    fixed = [mask if (prefix >> (shardBits - 1 - i)) & 1 else 0 for i in range(shardBits)]
+    return fixed + [patterns[char] for char in inputChars[shardBits:]], mask
+
+def tableRows(table:int, count:int):
+    
+    '''
+    Generator yielding the row numbers set in a bit-parallel table. The table
+    is converted to a string once so finding each row is not a full pass over
+    the integer.
+    '''
+    
+    bits = format(table, "0{}b".format(1 << count))[::-1]
+    row = bits.find("1")
+    while row != -1:
+        yield row
+        row = bits.find("1", row + 1)
 
-# Initial message
-print("Boolean Algebra Engine")
-print("\nType help to get help\n")
+def tableChunks(trees:list, inputChars:list, chunkBits=None):
+    
+    '''
+    Generator evaluating a truth table a chunk at a time, the table of one tree or
+    the XOR of several. Each chunk is a shard of up to 2^chunkBits rows so only one
+    chunk is ever held in memory. Yields the first row of the chunk, the chunk's
+    bit-parallel table and the number of inputs that vary within the chunk.
+    '''
+    
+    if chunkBits == None:
+        chunkBits = ChunkBits
+    
+    functions = [compileTree(tree, inputChars) for tree in trees]
+    shardBits = max(0, len(inputChars) - chunkBits)
+    chunkVars = len(inputChars) - shardBits
+    
+    for prefix in range(1 << shardBits):
+        args, mask = shardInputs(inputChars, shardBits, prefix)
+        start = time.perf_counter() if Stats.enabled else None
+        bits = 0
+        for function in functions:
+            bits ^= function(*args, mask=mask)
+        if start != None:
+            Stats.evaluated(trees, inputChars, args, mask, start)
+        yield prefix << chunkVars, bits, chunkVars
 
-while(run):
-    # Input function
+class GrayEvaluator():
+    
+    '''
+    Incremental evaluation of a tree for truth tables walked in Gray code order,
+    where exactly one input changes from one row to the next. Every node keeps its
+    value and and/or nodes keep how many of their children decide them (true
+    children of an or, false children of an and), a xor flips whenever one of its
+    children changes. Changing an input only updates the parents of its leaves and
+    carries on upwards while values keep changing, so a row costs the part of the
+    tree depending on that input rather than the whole tree. Inputs start at 0.
+    '''
     
-    func = input("> ")
+    def __init__(self, tree:Node, inputChars:list=None):
+        if inputChars == None:
+            inputChars = sorted(tree.getSupport())
         
-    if func == "quit":
-        # command to quit the application
-        print("Goodbye!")
-        run = False
+        nodes = list(postOrder(tree))
+        index = {id(node):i for i,node in enumerate(nodes)}
+        parents = [[] for node in nodes]
         
-    elif func == "eval":
-        # Command allowing user to evaluate a boolean algebra statement
-        # with defined inputs
-        statement = convert(input("Boolean statement: "))
-        inputs = constructInputsDict(statement)
-        statementTree = constructTree(statement)
-        print(statementTree.eval(inputs))
+        self.operators = [node.operator for node in nodes]
+        self.values = [0] * len(nodes)
+        self.counts = [0] * len(nodes)
+        
+        for i,node in enumerate(nodes):
+            children = [index[id(child)] for child in nodeChildren(node)]
+            for child in children:
+                parents[child].append(i)
+            
+            if node.operator == "v":
+                if node.Children.isdigit():
+                    self.values[i] = int(node.Children)
+            elif node.operator == "'":
+                self.values[i] = 1 - self.values[children[0]]
+            elif node.operator == "^":
+                self.values[i] = sum([self.values[child] for child in children]) & 1
+            else:
+                deciding = 1 if node.operator == "+" else 0
+                self.counts[i] = sum([1 for child in children if self.values[child] == deciding])
+                self.values[i] = deciding if self.counts[i] > 0 else 1 - deciding
         
-    elif func == "compare":
-        # Command to compare if two statements are identical based on their
-        # truth tables
-        statement1 = convert(input("Boolean Statement 1: "))
-        statement2 = convert(input("Boolean Statement 2: "))
+        # Updates are events telling a parent one of its children changed to a
+        # value, the events for each node changing to 0 and to 1 are built once
+        self.events = [([(parent, 0) for parent in parents[i]], [(parent, 1) for parent in parents[i]])
+                       for i in range(len(nodes))]
         
-        compare(statement1, statement2)
+        # An input's leaves aren't updated themselves, only their parents are told
+        self.inputs = {char:([], []) for char in inputChars}
+        for i,node in enumerate(nodes):
+            if node.operator == "v" and not node.Children.isdigit():
+                self.inputs[node.Children][0].extend(self.events[i][0])
+                self.inputs[node.Children][1].extend(self.events[i][1])
         
-    elif func == "help":
-        print("Commands:")
-        print(" - quit")
-        print("   ~quits")
-        print(" - eval")
-        print("   ~prompts for a boolean statement to be entered and will then")
-        print("    evaluate it to a final value")
-        print(" - compare")
-        print("   ~prompts for two boolean statements to be entered and will then")
-        print("    have their truth tables compared")
-        print(" - table")
-        print("   ~prompts the user to enter a boolean statement, the truth table")
-        print("    for the defined expression will then be generated")
-        print(" - checksteps")
-        print("   ~prompts the user to enter a boolean expression, the user will")
-        print("    the be required to enter n more statements and each will be checked")
-        print("    and if an incorrect step is entered the user will be notified")
-        print("    is useful to check working(s) out for a simplification.")
+        # Current value of every input, setting an input to its value is a no-op
+        self.inputValues = {char:0 for char in inputChars}
         
-    elif func == "table":
-        statement = convert(input("Boolean Statement: "))
-        truthTable(statement)
+        self.root = index[id(tree)]
+        self.rootInput = tree.Children if tree.operator == "v" and not tree.Children.isdigit() else None
+    
+    def value(self):
+        return self.values[self.root]
+    
+    def set(self, char:str, val:int):
         
-    elif func == "checksteps":
-        # Check steps will let the user enter all of their steps.
+        '''
+        Sets an input and updates every node whose value changes because of it,
+        setting an input to the value it already has changes nothing. Returns the
+        value of the tree.
+        '''
         
-        print("Type break when you're finished entering steps")
+        if self.inputValues[char] == val:
+            return self.values[self.root]
+        self.inputValues[char] = val
         
-        initExpr = input("Initial Expression: ")
+        values = self.values
+        counts = self.counts
+        operators = self.operators
+        events = self.events
         
-        step = 1
-        prevExpr = initExpr
+        if char == self.rootInput:
+            values[self.root] = val
         
-        moreSteps = True
-        while moreSteps:
-            expr = input("Step {0}: ".format(step))
+        stack = list(self.inputs[char][val])
+        while stack:
+            node, val = stack.pop()
+            operator = operators[node]
+            if operator == "+":
+                counts[node] += 1 if val else -1
+                val = 1 if counts[node] else 0
+            elif operator == "*":
+                counts[node] += -1 if val else 1
+                val = 0 if counts[node] else 1
+            elif operator == "^":
+                val = 1 - values[node]
+            else:
+                val = 1 - val
             
-            if expr.lower() == "break":
-                moreSteps = False
-                print("All steps are were correct!")
+            if values[node] != val:
+                values[node] = val
+                stack.extend(events[node][val])
+        
+        return values[self.root]
+
+def grayChunks(trees:list, inputChars:list, chunkBits=None):
+    
+    '''
+    Generator yielding the same chunks as tableChunks with the rows of each chunk
+    evaluated in Gray code order by incremental evaluators, one input changes
+    from each row to the next so only the nodes depending on it are updated.
+    '''
+    
+    if chunkBits == None:
+        chunkBits = ChunkBits
+    
+    evaluators = [GrayEvaluator(tree, inputChars) for tree in trees]
+    count = len(inputChars)
+    chunkVars = min(count, chunkBits)
+    current = 0 # Row the evaluators are set to
+    
+    def moveTo(row):
+        # Changes the inputs that differ between the current row and row
+        changed = current ^ row
+        while changed:
+            bit = changed & -changed
+            changed ^= bit
+            # Input i is bit count - 1 - i of the row
+            char = inputChars[count - bit.bit_length()]
+            for evaluator in evaluators:
+                evaluator.set(char, 1 if row & bit else 0)
+        return row
+    
+    for first in range(0, 1 << count, 1 << chunkVars):
+        start = time.perf_counter() if Stats.enabled else None
+        outputs = ["0"] * (1 << chunkVars)
+        for step in range(1 << chunkVars):
+            # Gray code of the step, consecutive steps differ in one bit
+            current = moveTo(first + (step ^ (step >> 1)))
+            val = 0
+            for evaluator in evaluators:
+                val ^= evaluator.value()
+            if val:
+                outputs[current - first] = "1"
+        if start != None:
+            Stats.counted(start, [Stats.operatorCounts(tree) for tree in trees])
+        yield first, int("".join(reversed(outputs)), 2), chunkVars
+
+def grayTable(trees:list, inputChars:list):
+    # The full bit-parallel table (or XOR of tables) evaluated in Gray code order
+    table = 0
+    for first, bits, chunkVars in grayChunks(trees, inputChars):
+        table |= bits << first
+    return table
+
+class ExpressionCache():
+    
+    '''
+    Bounded cache of parsed trees, and optionally their truth tables, with least
+    recently used eviction. Keys are the statement converted with whitespace and
+    redundant outer brackets removed, so the same expression written differently
+    shares an entry. Entries are evicted once there are more than maxEntries or
+    their estimated size goes over memoryBudget bytes. Cached trees are shared and
+    must not be changed.
+    '''
+    
+    # Rough size of one Node along with its attribute dictionary
+    NodeBytes = 200
+    
+    def __init__(self, maxEntries=1024, memoryBudget=64 << 20, cacheTables=True):
+        self.maxEntries = maxEntries
+        self.memoryBudget = memoryBudget
+        self.cacheTables = cacheTables
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def key(self, statement:str):
+        statement = "".join(statement.split())
+        if statement == "":
+            return statement
+        return cleanBrackets(convert(statement))
+    
+    def entry(self, statement:str):
+        # Cached entry of a statement, parsing it on a miss
+        key = self.key(statement)
+        
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        
+        self.misses += 1
+        
+        # The statement itself is parsed so syntax errors point into it
+        tree = constructTree(statement)
+        entry = {"tree":tree, "tables":{}, "size":self.NodeBytes * sum(1 for node in postOrder(tree))}
+        self.entries[key] = entry
+        self.size += entry["size"]
+        self.evict()
+        return entry
+    
+    def tree(self, statement:str):
+        return self.entry(statement)["tree"]
+    
+    def table(self, statement:str, inputChars:list):
+        # Bit-parallel truth table of a statement over inputChars
+        entry = self.entry(statement)
+        order = tuple(inputChars)
+        
+        if order in entry["tables"]:
+            return entry["tables"][order]
+        
+        table = tableBits(entry["tree"], inputChars)
+        if self.cacheTables:
+            size = (1 << len(inputChars)) // 8 + 32
+            entry["tables"][order] = table
+            entry["size"] += size
+            self.size += size
+            self.evict()
+        return table
+    
+    def evict(self):
+        # The most recent entry is always kept even if it's over budget alone
+        while len(self.entries) > 1 and (len(self.entries) > self.maxEntries or self.size > self.memoryBudget):
+            key, entry = self.entries.popitem(last=False)
+            self.size -= entry["size"]
+    
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self):
+        return {"hits":self.hits, "misses":self.misses, "entries":len(self.entries), "bytes":self.size}
+
+# Cache shared by every public entry point
+Cache = ExpressionCache()
+
+class Instrumentation():
+    
+    '''
+    Optional counters and timers showing where the time of a comparison goes.
+    While enabled it times the convert, constructTree, compile and eval phases and
+    counts the nodes evaluated by operator. Bit-parallel and Gray code evaluation
+    count every node once per chunk of rows, row by row evaluation once per row,
+    the bdd and sat strategies once per tree built or encoded and the aig strategy
+    counts the graph's and nodes. Sampling mode also attributes evaluation time to
+    subtrees: one bit-parallel evaluation in SampleEvery is repeated node by node
+    with each subtree timed. Evaluation done in parallel workers isn't counted.
+    While disabled the only cost is checking the enabled flag at each phase.
+    '''
+    
+    # Sampling mode profiles one evaluation in SampleEvery
+    SampleEvery = 16
+    
+    def __init__(self):
+        self.enabled = False
+        self.sampling = False
+        self.reset()
+    
+    def enable(self, sampling=False):
+        self.enabled = True
+        self.sampling = sampling
+    
+    def disable(self):
+        self.enabled = False
+        self.sampling = False
+    
+    def reset(self):
+        self.phases = {} # Phase name to its calls and seconds
+        self.evals = {} # Operator to the nodes evaluated
+        self.samples = {} # Node id to the node, its seconds and samples
+        self.counts = {} # Tree id to the tree and its nodes by operator
+        self.passes = 0
+    
+    def time(self, phase:str, start:float):
+        # Adds the time since start to a phase
+        entry = self.phases.setdefault(phase, [0, 0.0])
+        entry[0] += 1
+        entry[1] += time.perf_counter() - start
+    
+    def tick(self):
+        # True for one evaluation in SampleEvery
+        self.passes += 1
+        return self.passes % self.SampleEvery == 1
+    
+    def sample(self, node:Node, seconds:float):
+        entry = self.samples.setdefault(id(node), [node, 0.0, 0])
+        entry[1] += seconds
+        entry[2] += 1
+    
+    def operatorCounts(self, tree:Node):
+        # Nodes of a tree by operator, counted once per tree
+        if id(tree) not in self.counts:
+            counts = {}
+            for node in postOrder(tree):
+                counts[node.operator] = counts.get(node.operator, 0) + 1
+            self.counts[id(tree)] = (tree, counts)
+        return self.counts[id(tree)][1]
+    
+    def counted(self, start:float, counts:list, passes=1):
+        # Records an evaluation that started at start, counts are dictionaries
+        # of nodes by operator that were each evaluated passes times
+        self.time("eval", start)
+        for nodes in counts:
+            for operator,count in nodes.items():
+                self.evals[operator] = self.evals.get(operator, 0) + count * passes
+    
+    def evaluated(self, trees:list, inputChars:list, args:list, mask:int, start:float):
+        # Records one bit-parallel evaluation of trees that started at start
+        self.counted(start, [self.operatorCounts(tree) for tree in trees])
+        if self.sampling and self.tick():
+            values = dict(zip(inputChars, args))
+            for tree in trees:
+                self.profile(tree, values, mask)
+    
+    def profile(self, tree:Node, values:dict, mask:int):
+        
+        '''
+        Evaluates a tree bit-parallel one node at a time, timing each node and
+        adding its children's times so every subtree is sampled with the time it
+        took as a whole.
+        '''
+        
+        clock = time.perf_counter
+        results = {}
+        totals = {}
+        for node in postOrder(tree):
+            start = clock()
+            if node.operator == "v":
+                val = mask if node.Children == "1" else 0 if node.Children == "0" else values[node.Children]
+            elif node.operator == "'":
+                val = mask ^ results[id(node.Children)]
+            elif node.operator == "+":
+                val = 0
+                for child in node.Children:
+                    val |= results[id(child)]
+            elif node.operator == "^":
+                val = 0
+                for child in node.Children:
+                    val ^= results[id(child)]
             else:
-                step+= 1
-                
-                if compare(initExpr, expr, False) == False:
-                    print("Invalid Step!")
-                    print(prevExpr,"!=",expr)
-                    moreSteps = False
-            prevExpr = expr
+                val = mask
+                for child in node.Children:
+                    val &= results[id(child)]
+            seconds = clock() - start + sum([totals[id(child)] for child in nodeChildren(node)])
+            results[id(node)] = val
+            totals[id(node)] = seconds
+            self.sample(node, seconds)
+    
+    def stats(self, top=10):
+        
+        '''
+        The counters as a dictionary: seconds and calls of each phase, nodes
+        evaluated by operator, the expression cache's hits and misses and, when
+        there are samples, the top subtrees by sampled time.
+        '''
+        
+        samples = heapq.nlargest(top, self.samples.values(), key=lambda entry: entry[1])
+        return {
+            "enabled": self.enabled,
+            "sampling": self.sampling,
+            "phases": {phase:{"calls":calls, "seconds":seconds} for phase,(calls,seconds) in self.phases.items()},
+            "evals": dict(self.evals),
+            "cache": Cache.stats(),
+            "subtrees": [{"expression":treeText(node), "seconds":seconds, "samples":count}
+                         for node,seconds,count in samples],
+        }
+    
+    def report(self, top=10):
+        # The counters as printable lines
+        stats = self.stats(top)
+        lines = ["Instrumentation is {}".format(
+            "off" if not self.enabled else "on (sampling)" if self.sampling else "on")]
+        for phase,entry in stats["phases"].items():
+            lines.append("{0:<14} {1:>10} calls {2:>12.6f}s".format(phase, entry["calls"], entry["seconds"]))
+        names = {"+":"or", "*":"and", "^":"xor", "'":"not", "v":"value"}
+        for operator,count in stats["evals"].items():
+            lines.append("{0:<14} {1:>10} nodes evaluated".format(names.get(operator, operator), count))
+        lines.append("cache          {hits:>10} hits {misses:>6} misses".format(**stats["cache"]))
+        if stats["subtrees"]:
+            lines.append("Slowest subtrees (sampled):")
+        for entry in stats["subtrees"]:
+            text = entry["expression"]
+            if len(text) > 60:
+                text = text[:57] + "..."
+            lines.append("{0:>12.6f}s  {1}".format(entry["seconds"], text))
+        return lines
+
+# Instrumentation shared by every public entry point, disabled by default
+Stats = Instrumentation()
+
+def cachedTree(statement:str):
+    return Cache.tree(statement)
+
+def cachedTable(statement:str, inputChars:list):
+    return Cache.table(statement, inputChars)
+
+def evalBatch(statement:str, assignments, inputChars:list=None):
+    
+    '''
+    Batch evaluation will evaluate a statement against every row of a 2-D
+    boolean array (rows x inputs) and return a boolean vector holding the
+    result for each row. Columns are taken in the order of inputChars which
+    defaults to the sorted inputs of the statement. Requires NumPy.
+    '''
+    
+    if numpy is None:
+        raise ImportError("Batch evaluation requires NumPy")
+    
+    statement = convert(statement)
+    
+    if inputChars == None:
+        inputChars = sorted(set(statement) & PossibleInputs)
+    
+    assignments = numpy.asarray(assignments, dtype=bool)
+    if assignments.ndim != 2 or assignments.shape[1] != len(inputChars):
+        raise ValueError("Expected an array of shape (rows, {})".format(len(inputChars)))
+    
+    # Each input is handed to the tree as a column of the assignments
+    columns = {char:assignments[:, i] for i,char in enumerate(inputChars)}
+    
+    return cachedTree(statement).evalBatch(columns, assignments.shape[0])
+
+def batchThroughput(statement:str, rows=100000, seed=0):
+    
+    '''
+    Reports the throughput of batch evaluation against row by row evaluation
+    with Node.eval over the same random assignments. The row by row path is
+    timed on at most 10000 rows to keep the report quick. Returns the rows per
+    second of each path.
+    '''
+    
+    if numpy is None:
+        raise ImportError("Batch evaluation requires NumPy")
+    
+    statement = convert(statement)
+    inputChars = sorted(set(statement) & PossibleInputs)
+    assignments = numpy.random.default_rng(seed).random((rows, len(inputChars))) < 0.5
+    
+    start = time.perf_counter()
+    batch = evalBatch(statement, assignments, inputChars)
+    batchRate = rows / max(time.perf_counter() - start, 1e-9)
+    
+    tree = cachedTree(statement)
+    sample = assignments[:10000]
+    
+    start = time.perf_counter()
+    single = [tree.eval(dict(zip(inputChars, row))) for row in sample.tolist()]
+    rowRate = len(sample) / max(time.perf_counter() - start, 1e-9)
+    
+    # Both paths must agree before their speed means anything
+    assert numpy.array_equal(batch[:len(sample)], numpy.array(single, dtype=bool))
+    
+    print("Batch:  {0:>14,.0f} rows/s".format(batchRate))
+    print("Eval:   {0:>14,.0f} rows/s".format(rowRate))
+    print("Speedup: {0:.1f}x".format(batchRate / rowRate))
+    
+    return batchRate, rowRate
+
+class AIG():
+    
+    '''
+    And-Inverter Graph, a graph built only from two input and nodes where any edge
+    may be inverted. Edges are literals, twice the index of a node plus one when
+    inverted, node 0 is constant false so literal 0 is false and literal 1 is true.
+    And nodes are structurally hashed so a subterm that appears many times is only
+    ever one node, and trivial identities are removed as nodes are made. Nodes are
+    created after their children so evaluating them in index order is always valid.
+    '''
+    
+    def __init__(self):
+        # Each node is None for the constant, an input's character or the
+        # pair of literals that are anded
+        self.nodes = [None]
+        self.inputs = {}
+        self.table = {}
+    
+    def __len__(self):
+        return len(self.nodes)
+    
+    def input(self, char:str):
+        # Inputs are created the first time they're used
+        if char not in self.inputs:
+            self.inputs[char] = 2 * len(self.nodes)
+            self.nodes.append(char)
+        return self.inputs[char]
+    
+    def Not(self, a:int):
+        return a ^ 1
+    
+    def And(self, a:int, b:int):
+        # Order the pair so A*B and B*A hash the same
+        if a > b:
+            a, b = b, a
+        
+        if a == 0:
+            # A*0 = 0
+            return 0
+        if a == 1 or a == b:
+            # A*1 = A and A*A = A
+            return b
+        if a == b ^ 1:
+            # A*A' = 0
+            return 0
+        
+        if (a, b) not in self.table:
+            self.table[(a, b)] = 2 * len(self.nodes)
+            self.nodes.append((a, b))
+        return self.table[(a, b)]
+    
+    def Or(self, a:int, b:int):
+        # De Morgan, A+B = (A'B')'
+        return self.And(a ^ 1, b ^ 1) ^ 1
+    
+    def Xor(self, a:int, b:int):
+        # A^B = AB' + A'B
+        return self.Or(self.And(a, b ^ 1), self.And(a ^ 1, b))
+    
+    def addTree(self, tree:Node):
+        
+        '''
+        Adds a tree to the graph and returns the literal of its root. Subterms
+        already in the graph, from this tree or any other, are reused.
+        '''
+        
+        literals = {}
+        for node in postOrder(tree):
+            if node.operator == "v":
+                if node.Children.isdigit():
+                    literal = int(node.Children)
+                else:
+                    literal = self.input(node.Children)
+            elif node.operator == "'":
+                literal = self.Not(literals[id(node.Children)])
+            else:
+                combine = {"+":self.Or, "*":self.And, "^":self.Xor}[node.operator]
+                children = [literals[id(child)] for child in node.Children]
+                literal = children[0]
+                for child in children[1:]:
+                    literal = combine(literal, child)
+            literals[id(node)] = literal
+        
+        return literals[id(tree)]
+    
+    def evalBits(self, literals:list, patterns:dict, mask:int):
+        
+        '''
+        Evaluates the given literals with every node computed once. Inputs are
+        bit-parallel patterns so with a single row of 0/1 values and a mask of 1
+        this is a single assignment, with a full table mask it's every row at
+        once. A node's value is dropped once nothing later needs it.
+        '''
+        
+        # Find the last node that reads each node so values can be freed
+        lastUse = {}
+        for i,node in enumerate(self.nodes):
+            if type(node) == tuple:
+                lastUse[node[0] >> 1] = i
+                lastUse[node[1] >> 1] = i
+        for literal in literals:
+            lastUse[literal >> 1] = len(self.nodes)
+        
+        values = {0:0}
+        for i,node in enumerate(self.nodes):
+            if i not in lastUse or i == 0:
+                continue
+            if type(node) == str:
+                values[i] = patterns[node]
+            else:
+                a, b = node
+                values[i] = ((values[a >> 1] ^ mask) if a & 1 else values[a >> 1]) & \
+                            ((values[b >> 1] ^ mask) if b & 1 else values[b >> 1])
+                for child in (a >> 1, b >> 1):
+                    if lastUse[child] == i and child != 0:
+                        del values[child]
+        
+        return [(values[literal >> 1] ^ mask) if literal & 1 else values[literal >> 1]
+                for literal in literals]
+    
+    def eval(self, literal:int, inputs:dict):
+        # A single assignment, matching Node.eval
+        return self.evalBits([literal], {char:int(val) for char,val in inputs.items()}, 1)[0]
+    
+    def compile(self, literals:list, inputChars:list):
+        
+        '''
+        Compiles the graph into a generated function like compileTree's, taking the
+        inputs in the order of inputChars along with a mask and returning a tuple
+        with the value of every literal. Each node is one line and is computed once
+        however many literals read it, a temporary is reused once the last node
+        reading it is done.
+        '''
+        
+        lastUse = {}
+        for i,node in enumerate(self.nodes):
+            if type(node) == tuple:
+                lastUse[node[0] >> 1] = i
+                lastUse[node[1] >> 1] = i
+        for literal in literals:
+            lastUse[literal >> 1] = len(self.nodes)
+        
+        names = {0:"0"}
+        free = [] # Temporaries free to be reused
+        lines = []
+        
+        def term(literal):
+            if literal & 1:
+                return "(mask ^ {})".format(names[literal >> 1])
+            return names[literal >> 1]
+        
+        for i,node in enumerate(self.nodes):
+            if i == 0 or i not in lastUse:
+                continue
+            if type(node) == str:
+                names[i] = node
+                continue
+            
+            a, b = node
+            line = " = {} & {}".format(term(a), term(b))
+            for child in set([a >> 1, b >> 1]):
+                if lastUse[child] == i and type(self.nodes[child]) == tuple:
+                    free.append(names[child])
+            names[i] = free.pop() if free else "t{}".format(len(lines))
+            lines.append(names[i] + line)
+        
+        source = "def evaluate({}):\n{}    return ({})\n".format(
+            ", ".join(inputChars + ["mask=1"]), "".join(["    " + line + "\n" for line in lines]),
+            "".join([term(literal) + ", " for literal in literals]))
+        
+        namespace = {}
+        exec(source, namespace)
+        function = namespace["evaluate"]
+        function.source = source
+        return function
+
+def variableOrder(trees:list, inputChars:list):
+    
+    '''
+    Variable ordering heuristic for decision diagrams. Inputs are ordered by their
+    first appearance reading the trees left to right, which keeps inputs that are
+    used together close together in the order. Inputs that never appear go last.
+    '''
+    
+    order = []
+    for tree in trees:
+        for node in postOrder(tree):
+            if node.operator == "v" and node.Children in inputChars and node.Children not in order:
+                order.append(node.Children)
+    
+    return order + [char for char in inputChars if char not in order]
+
+class BDD():
+    
+    '''
+    Reduced ordered binary decision diagram. Every node tests one input and has a
+    low child (input is 0) and a high child (input is 1), inputs are tested in the
+    same order on every path. Nodes are kept in a unique table so two nodes never
+    share an input and children, this makes the diagram canonical and two functions
+    are equivalent exactly when they're the same node. Node 0 and node 1 are the
+    constant false and true.
+    '''
+    
+    # Sifting stops moving an input once the diagrams grow past this factor of
+    # the smallest size found
+    MaxGrowth = 1.2
+    
+    def __init__(self, order:list, siftNodes=None):
+        self.order = list(order)
+        self.level = {char:i for i,char in enumerate(self.order)}
+        
+        # Trees are sifted while they're added once the diagram passes this many
+        # nodes, the limit doubles after every sift. None never reorders
+        self.siftNodes = siftNodes
+        
+        # Node fields are kept in parallel lists indexed by node
+        self.var = [None, None]
+        self.lo = [0, 1]
+        self.hi = [0, 1]
+        
+        self.unique = {}
+        self.computed = {}
+    
+    def __len__(self):
+        return len(self.var)
+    
+    def levelOf(self, f:int):
+        # Constants sit below every input
+        return len(self.order) if f < 2 else self.level[self.var[f]]
+    
+    def mk(self, char:str, lo:int, hi:int):
+        # A test where both sides are the same is redundant
+        if lo == hi:
+            return lo
+        key = (char, lo, hi)
+        if key not in self.unique:
+            self.unique[key] = len(self.var)
+            self.var.append(char)
+            self.lo.append(lo)
+            self.hi.append(hi)
+        return self.unique[key]
+    
+    def input(self, char:str):
+        if char not in self.level:
+            raise KeyError(char)
+        return self.mk(char, 0, 1)
+    
+    def cofactors(self, f:int, level:int):
+        # Low and high cofactors of f for the input at level
+        if self.levelOf(f) == level:
+            return self.lo[f], self.hi[f]
+        return f, f
+    
+    def ite(self, f:int, g:int, h:int):
+        
+        '''
+        If-then-else, the function that is g where f is true and h elsewhere. Every
+        other operator is built from ite. Results are kept in the computed table so
+        shared subproblems are only solved once.
+        '''
+        
+        # Terminal cases
+        if f == 1:
+            return g
+        if f == 0:
+            return h
+        if g == h:
+            return g
+        if g == 1 and h == 0:
+            return f
+        
+        key = (f, g, h)
+        if key in self.computed:
+            return self.computed[key]
+        
+        # Split on the topmost input of the three
+        level = min(self.levelOf(f), self.levelOf(g), self.levelOf(h))
+        f0, f1 = self.cofactors(f, level)
+        g0, g1 = self.cofactors(g, level)
+        h0, h1 = self.cofactors(h, level)
+        
+        result = self.mk(self.order[level], self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        self.computed[key] = result
+        return result
+    
+    def Not(self, f:int):
+        return self.ite(f, 0, 1)
+    
+    def And(self, f:int, g:int):
+        return self.ite(f, g, 0)
+    
+    def Or(self, f:int, g:int):
+        return self.ite(f, 1, g)
+    
+    def Xor(self, f:int, g:int):
+        return self.ite(f, self.Not(g), g)
+    
+    def addTree(self, tree:Node, keep:list=()):
+        # Builds the diagram of a tree and returns its root node, keep holds
+        # nodes built earlier that must stay valid if the inputs are reordered
+        built = {}
+        for node in postOrder(tree):
+            if node.operator == "v":
+                if node.Children.isdigit():
+                    f = int(node.Children)
+                else:
+                    f = self.input(node.Children)
+            elif node.operator == "'":
+                f = self.Not(built[id(node.Children)])
+            else:
+                combine = {"+":self.Or, "*":self.And, "^":self.Xor}[node.operator]
+                children = [built[id(child)] for child in node.Children]
+                f = children[0]
+                for child in children[1:]:
+                    f = combine(f, child)
+            built[id(node)] = f
+            
+            if self.siftNodes != None and len(self) > self.siftNodes:
+                # The rest of the tree is built in the improved order
+                self.sift(list(keep) + list(built.values()))
+                self.siftNodes = 2 * len(self)
+        
+        return built[id(tree)]
+    
+    def satCount(self, f:int):
+        # Number of assignments to every input in the order that make f true
+        counts = {0:0, 1:1}
+        for node in self.reachable([f]):
+            if node > 1:
+                lo, hi = self.lo[node], self.hi[node]
+                level = self.levelOf(node)
+                counts[node] = counts[lo] << (self.levelOf(lo) - level - 1)
+                counts[node] += counts[hi] << (self.levelOf(hi) - level - 1)
+        return counts[f] << self.levelOf(f)
+    
+    def pickOne(self, f:int):
+        
+        '''
+        One satisfying assignment of f found by walking a single path to the true
+        node, inputs not tested on the path are 0. Returns None if f is false.
+        '''
+        
+        if f == 0:
+            return None
+        assignment = {char:0 for char in self.order}
+        while f > 1:
+            if self.lo[f] != 0:
+                f = self.lo[f]
+            else:
+                assignment[self.var[f]] = 1
+                f = self.hi[f]
+        return assignment
+    
+    def paths(self, f:int):
+        
+        '''
+        Generator of every path from f to the true node as a dictionary of the
+        inputs tested along the path. Paths are disjoint and together cover every
+        satisfying assignment of f.
+        '''
+        
+        stack = [(f, {})]
+        while stack:
+            node, path = stack.pop()
+            if node == 1:
+                yield path
+            elif node > 1:
+                stack.append((self.hi[node], {**path, self.var[node]:1}))
+                stack.append((self.lo[node], {**path, self.var[node]:0}))
+    
+    def satisfying(self, f:int, inputChars:list=None):
+        
+        '''
+        Generator of every satisfying assignment of f as an input dictionary. Paths
+        to the true node are walked low side first and inputs a path doesn't test
+        are expanded both ways. No node other than false is a dead end so the cost
+        follows the number of assignments rather than the size of the cube.
+        '''
+        
+        if inputChars == None:
+            inputChars = self.order
+        
+        stack = [(f, 0, {})]
+        while stack:
+            node, level, assignment = stack.pop()
+            if node == 0:
+                continue
+            if level == len(self.order):
+                yield {char:assignment[char] for char in inputChars}
+                continue
+            
+            char = self.order[level]
+            if self.levelOf(node) == level:
+                children = (self.lo[node], self.hi[node])
+            else:
+                children = (node, node)
+            
+            # High side is pushed first so the low side is walked first
+            for val in (1, 0):
+                if children[val] != 0:
+                    stack.append((children[val], level + 1, {**assignment, char:val}))
+    
+    def reachable(self, roots:list):
+        # Every node below the roots, children are listed before their parents
+        seen = set()
+        ordered = []
+        stack = [(root, False) for root in roots]
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                ordered.append(node)
+            elif node not in seen:
+                seen.add(node)
+                stack.append((node, True))
+                if node > 1:
+                    stack.append((self.lo[node], False))
+                    stack.append((self.hi[node], False))
+        return ordered
+    
+    def swap(self, level:int, roots:list):
+        
+        '''
+        Swaps the inputs at level and level + 1 in place. Every node keeps the
+        function it stands for, nodes testing the upper input that depend on the
+        lower input are rewritten to test the lower input first.
+        '''
+        
+        x, y = self.order[level], self.order[level + 1]
+        upper = [node for node in self.reachable(roots) if self.var[node] == x]
+        
+        self.order[level], self.order[level + 1] = y, x
+        self.level[x], self.level[y] = level + 1, level
+        self.computed.clear()
+        
+        for node in upper:
+            lo, hi = self.lo[node], self.hi[node]
+            if self.var[lo] != y and self.var[hi] != y:
+                # Doesn't depend on y, still a valid x node below y
+                continue
+            
+            f00, f01 = (self.lo[lo], self.hi[lo]) if self.var[lo] == y else (lo, lo)
+            f10, f11 = (self.lo[hi], self.hi[hi]) if self.var[hi] == y else (hi, hi)
+            
+            del self.unique[(x, lo, hi)]
+            self.var[node] = y
+            self.lo[node] = self.mk(x, f00, f10)
+            self.hi[node] = self.mk(x, f01, f11)
+            self.unique[(y, self.lo[node], self.hi[node])] = node
+    
+    def sift(self, roots:list):
+        
+        '''
+        Sifting reorders the inputs to shrink the diagrams of the roots. Each input
+        in turn is swapped down and then up through the levels, turning back where
+        the diagrams grow too much, and left where they were smallest. Roots keep
+        their node numbers and functions. Returns the size of the diagrams.
+        '''
+        
+        size = lambda: len(self.reachable(roots))
+        
+        for char in list(self.order):
+            best, bestLevel = size(), self.level[char]
+            
+            # Down towards the bottom, then up towards the top, turning back once
+            # the diagrams grow past MaxGrowth times the best size
+            current = best
+            while self.level[char] < len(self.order) - 1 and current <= best * self.MaxGrowth:
+                self.swap(self.level[char], roots)
+                current = size()
+                if current < best:
+                    best, bestLevel = current, self.level[char]
+            current = best
+            while self.level[char] > 0 and current <= best * self.MaxGrowth:
+                self.swap(self.level[char] - 1, roots)
+                current = size()
+                if current < best:
+                    best, bestLevel = current, self.level[char]
+            
+            while self.level[char] < bestLevel:
+                self.swap(self.level[char], roots)
+            while self.level[char] > bestLevel:
+                self.swap(self.level[char] - 1, roots)
+        
+        return size()
+
+def luby(i:int):
+    # The i-th term (from 0) of the Luby sequence 1 1 2 1 1 2 4 ...
+    size, power = 1, 0
+    while size < i + 1:
+        power += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        power -= 1
+        i = i % size
+    return 1 << power
+
+class SATSolver():
+    
+    '''
+    Conflict driven clause learning SAT solver. Variables are numbered from 1 and
+    literals are signed variables as in DIMACS, -3 is the negation of 3. Clauses
+    are watched on their first two literals so only clauses with a watch that has
+    become false are looked at during propagation. Every conflict is analysed back
+    to its first unique implication point and learnt as a new clause, decisions
+    follow the activity of variables in recent conflicts and the search restarts
+    on the Luby sequence.
+    '''
+    
+    def __init__(self):
+        self.numVars = 0
+        
+        # Per variable state, indexed by variable (index 0 is unused)
+        self.values = [0] # 1 true, -1 false, 0 unassigned
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.polarity = [False]
+        
+        self.watches = {}
+        self.clauses = []
+        self.learnts = []
+        
+        self.trail = []
+        self.trailLim = [] # Where each decision level starts on the trail
+        self.qhead = 0
+        
+        self.heap = []
+        self.increment = 1.0
+        self.model = None
+        self.ok = True
+    
+    def newVar(self):
+        self.numVars += 1
+        var = self.numVars
+        self.values.append(0)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.polarity.append(False)
+        self.watches[var] = []
+        self.watches[-var] = []
+        heapq.heappush(self.heap, (0.0, var))
+        return var
+    
+    def litValue(self, lit:int):
+        # 1 if the literal is true, -1 if false and 0 if unassigned
+        val = self.values[abs(lit)]
+        return val if lit > 0 else -val
+    
+    def addClause(self, lits:list):
+        
+        '''
+        Adds a clause, must be called between solves. Returns False once the clauses
+        are known to be unsatisfiable.
+        '''
+        
+        if not self.ok:
+            return False
+        
+        clause = []
+        for lit in lits:
+            if -lit in clause or self.litValue(lit) == 1:
+                # Clause is already satisfied
+                return True
+            if lit not in clause and self.litValue(lit) == 0:
+                clause.append(lit)
+        
+        if len(clause) == 0:
+            self.ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self.ok = self.propagate() == None
+        else:
+            self.attach(clause)
+            self.clauses.append(clause)
+        return self.ok
+    
+    def attach(self, clause:list):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+    
+    def enqueue(self, lit:int, reason):
+        var = abs(lit)
+        self.values[var] = 1 if lit > 0 else -1
+        self.levels[var] = len(self.trailLim)
+        self.reasons[var] = reason
+        self.trail.append(lit)
+    
+    def propagate(self):
+        
+        '''
+        Unit propagation over the watched literals. Returns the conflicting clause
+        or None if there was no conflict. A clause that implies a literal always
+        has that literal first so it can be used as the literal's reason.
+        '''
+        
+        while self.qhead < len(self.trail):
+            falseLit = -self.trail[self.qhead]
+            self.qhead += 1
+            
+            watchers = self.watches[falseLit]
+            self.watches[falseLit] = kept = []
+            
+            for i,clause in enumerate(watchers):
+                # Keep the false literal second
+                if clause[0] == falseLit:
+                    clause[0], clause[1] = clause[1], clause[0]
+                
+                if self.litValue(clause[0]) == 1:
+                    kept.append(clause)
+                    continue
+                
+                # Look for a new literal to watch
+                for k in range(2, len(clause)):
+                    if self.litValue(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.litValue(clause[0]) == -1:
+                        kept.extend(watchers[i + 1:])
+                        self.qhead = len(self.trail)
+                        return clause
+                    self.enqueue(clause[0], clause)
+        
+        return None
+    
+    def analyze(self, conflict:list):
+        
+        '''
+        Conflict analysis, resolves the conflict with the reasons of the literals
+        on the current level until only one of them is left (the first unique
+        implication point). Returns the learnt clause, with its asserting literal
+        first, and the level to go back to.
+        '''
+        
+        seen = set()
+        learnt = [None]
+        counter = 0
+        lit = None
+        index = len(self.trail) - 1
+        clause = conflict
+        
+        while True:
+            for other in clause:
+                var = abs(other)
+                if other != lit and var not in seen and self.levels[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.levels[var] == len(self.trailLim):
+                        counter += 1
+                    else:
+                        learnt.append(other)
+            
+            # Next literal on the trail that took part in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.reasons[abs(lit)]
+        
+        learnt[0] = -lit
+        
+        if len(learnt) == 1:
+            return learnt, 0
+        
+        # Watch the literal from the highest remaining level second
+        highest = max(range(1, len(learnt)), key=lambda i: self.levels[abs(learnt[i])])
+        learnt[1], learnt[highest] = learnt[highest], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+    
+    def bump(self, var:int):
+        self.activity[var] += self.increment
+        if self.activity[var] > 1e100:
+            # Rescale before activities overflow
+            self.activity = [val * 1e-100 for val in self.activity]
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[v], v) for v in range(1, self.numVars + 1)]
+            heapq.heapify(self.heap)
+        heapq.heappush(self.heap, (-self.activity[var], var))
+    
+    def cancelUntil(self, level:int):
+        # Undo every assignment above level, remembering their phases
+        if len(self.trailLim) > level:
+            for lit in self.trail[self.trailLim[level]:]:
+                var = abs(lit)
+                self.polarity[var] = lit > 0
+                self.values[var] = 0
+                self.reasons[var] = None
+                heapq.heappush(self.heap, (-self.activity[var], var))
+            del self.trail[self.trailLim[level]:]
+            del self.trailLim[level:]
+            self.qhead = len(self.trail)
+    
+    def pickBranch(self):
+        # Most active unassigned variable, stale heap entries are skipped
+        while self.heap:
+            var = heapq.heappop(self.heap)[1]
+            if self.values[var] == 0:
+                return var
+        return None
+    
+    def solve(self):
+        
+        '''
+        Searches for a satisfying assignment. Returns True and sets model (a list
+        of booleans indexed by variable) if one was found, False if the clauses are
+        unsatisfiable.
+        '''
+        
+        self.model = None
+        if not self.ok:
+            return False
+        
+        conflicts = 0
+        restarts = 0
+        limit = luby(restarts) * 100
+        
+        while True:
+            conflict = self.propagate()
+            
+            if conflict != None:
+                conflicts += 1
+                if len(self.trailLim) == 0:
+                    # Conflict without any decisions
+                    self.ok = False
+                    return False
+                
+                learnt, level = self.analyze(conflict)
+                self.cancelUntil(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.attach(learnt)
+                    self.learnts.append(learnt)
+                    self.enqueue(learnt[0], learnt)
+                self.increment /= 0.95
+                
+                if conflicts >= limit:
+                    restarts += 1
+                    limit = conflicts + luby(restarts) * 100
+                    self.cancelUntil(0)
+            
+            else:
+                var = self.pickBranch()
+                if var == None:
+                    self.model = [val == 1 for val in self.values]
+                    self.cancelUntil(0)
+                    return True
+                self.trailLim.append(len(self.trail))
+                self.enqueue(var if self.polarity[var] else -var, None)
+
+def tseitin(tree:Node, solver:SATSolver, inputVars:dict):
+    
+    '''
+    Tseitin encoding of a tree into the clauses of a solver. Every and/or node gets a
+    new variable with clauses forcing it to equal the node, a xor gets one for each
+    pair it combines, nots are negated literals and inputs use the variables in
+    inputVars. Returns the literal of the root, the encoding is satisfiable exactly
+    when the tree is with the root literal true.
+    '''
+    
+    literals = {}
+    for node in postOrder(tree):
+        if node.operator == "v":
+            if node.Children.isdigit():
+                # Constants share a variable that is forced true
+                if "1" not in inputVars:
+                    inputVars["1"] = solver.newVar()
+                    solver.addClause([inputVars["1"]])
+                literal = inputVars["1"] if node.Children == "1" else -inputVars["1"]
+            else:
+                literal = inputVars[node.Children]
+        
+        elif node.operator == "'":
+            literal = -literals[id(node.Children)]
+        
+        elif node.operator == "^":
+            # A chain of two input xors, each with the four clauses of x = a^b
+            children = [literals[id(child)] for child in node.Children]
+            literal = children[0]
+            for child in children[1:]:
+                a, b = literal, child
+                literal = solver.newVar()
+                solver.addClause([-literal, a, b])
+                solver.addClause([-literal, -a, -b])
+                solver.addClause([literal, -a, b])
+                solver.addClause([literal, a, -b])
+        
+        else:
+            children = [literals[id(child)] for child in node.Children]
+            literal = solver.newVar()
+            
+            # Or is and with every literal negated
+            sign = 1 if node.operator == "*" else -1
+            solver.addClause([sign * literal] + [-sign * child for child in children])
+            for child in children:
+                solver.addClause([-sign * literal, sign * child])
+        
+        literals[id(node)] = literal
+    
+    return literals[id(tree)]
+
+def countModels(statement:str, inputChars:list=None):
+    
+    '''
+    Exact number of assignments of the inputs that make a statement true. The
+    count is read off the statement's decision diagram so the truth table is never
+    walked. Inputs default to the ones the statement uses, every extra input
+    doubles the count.
+    '''
+    
+    tree = cachedTree(statement)
+    if inputChars == None:
+        inputChars = statementInputs(statement)
+    
+    diagram = BDD(variableOrder([tree], inputChars), SiftNodes)
+    return diagram.satCount(diagram.addTree(tree))
+
+def models(statement:str, inputChars:list=None):
+    
+    '''
+    Generator of every assignment of the inputs that makes a statement true, as
+    input dictionaries. Assignments are read lazily from the statement's decision
+    diagram so the cost follows the number of assignments read rather than the
+    size of the truth table. They come in the diagram's variable order, not row
+    order.
+    '''
+    
+    tree = cachedTree(statement)
+    if inputChars == None:
+        inputChars = statementInputs(statement)
+    
+    diagram = BDD(variableOrder([tree], inputChars))
+    yield from diagram.satisfying(diagram.addTree(tree), inputChars)
+
+def satisfy(statement:str):
+    
+    '''
+    Finds an assignment of the inputs of a statement that makes it true using the
+    SAT solver. Returns the input dictionary, or None if the statement can never
+    be true.
+    '''
+    
+    inputChars = sorted(set(statement) & PossibleInputs)
+    tree = cachedTree(statement)
+    
+    solver = SATSolver()
+    inputVars = {char:solver.newVar() for char in inputChars}
+    solver.addClause([tseitin(tree, solver, inputVars)])
+    
+    if not solver.solve():
+        return None
+    return {char:int(solver.model[inputVars[char]]) for char in inputChars}
+
+def compare(statement1:str, statement2:str, printFailures=True, strategy="bits", workers=None,
+            stopOnFirst=False, maxFailures=None):
+    
+    '''
+    Compare function will compare two inputted statements, generate a truth table for each
+    and verify if the statements produce the same output(s) for their corresponding input(s).
+    The default "bits" strategy evaluates every row at once as integer bitmasks, "rows"
+    evaluates the trees one row at a time, "aig" evaluates both statements on one
+    shared And-Inverter Graph, "bdd" compares canonical decision diagrams without
+    walking the truth table and "sat" searches for a single failure with the SAT
+    solver, the fail count is then unknown. The "parallel" strategy splits the truth
+    table across workers processes (all cores by default) and "gray" walks the rows
+    in Gray code order, updating only the nodes that depend on the changed input.
+    The "auto" strategy simulates both statements on random rows first, statements
+    that differ there are refuted with the fail count unknown, otherwise they're
+    compared by bits or, with more than ExhaustiveBits inputs, bdd.
+    
+    With stopOnFirst the comparison ends at the first failure and with maxFailures it
+    ends once that many failures have been found, in both cases the failures aren't
+    all counted so the rest of the truth table is never evaluated.
+    '''
+    
+    inputChars = statementInputs(statement1)
+        
+    limit = 1 if stopOnFirst else maxFailures
+    
+    if strategy == "bits" and Store != None:
+        # Stored tables are compared straight from their memory maps
+        fails, failures = packedFailures(Store.table(statement1, inputChars),
+                                         Store.table(statement2, inputChars), inputChars)
+    elif strategy == "bits" and len(inputChars) <= CachedTableBits:
+        # Small enough tables are compared straight from the cache
+        difference = cachedTable(statement1, inputChars) ^ cachedTable(statement2, inputChars)
+        fails, failures = tableFailures(difference, inputChars)
+    else:
+        # Construct trees
+        statement1 = cachedTree(statement1)
+        statement2 = cachedTree(statement2)
+        
+        # Without printing or a limit only whether the statements differ matters,
+        # so strategies can stop at the first failure (parallel cancels its pool)
+        count = limit == None and printFailures == True
+        fails, failures = compareTrees(statement1, statement2, inputChars, strategy, workers, count)
+        if not count and limit == None:
+            limit = 1
+    if limit != None:
+        failures = itertools.islice(failures, limit)
+    
+    if printFailures == True:    
+        print("Testing...")
+    
+    found = 0
+    if printFailures == True or fails == None:
+        # Failures are only walked when they're printed or haven't been counted
+        for InputDict in failures:
+            # failed, notify users of failure values
+            found += 1
+            if printFailures == True:
+                print("Failure with parameters:")
+                print(" ".join([char+"="+str(InputDict[char]) for char in InputDict.keys()]))
+            
+    # Testing complete, notify failure count or if success
+    if fails == 0 or (fails == None and found == 0):
+        if printFailures == True:
+            print("Statements are identical")
+        return True
+    else:
+        if printFailures == True:
+            print("Statements are NOT identical")
+            if fails != None:
+                print("Failures encountered: {0:<5} ".format(fails))
+            elif found == limit:
+                print("Stopped after {} failure(s)".format(found))
+        return False
+
+def iterFailures(statement1:str, statement2:str, strategy="bits", workers=None):
+    
+    '''
+    Generator yielding the input dictionary of every row where two statements differ.
+    Failures are found lazily, nothing past the last failure read is evaluated. The
+    sat strategy only ever yields one failure.
+    '''
+    
+    inputChars = statementInputs(statement1)
+    if strategy == "bits" and Store != None:
+        yield from packedFailures(Store.table(statement1, inputChars), Store.table(statement2, inputChars),
+                                  inputChars, False)[1]
+        return
+    
+    tree1 = cachedTree(statement1)
+    tree2 = cachedTree(statement2)
+    
+    yield from compareTrees(tree1, tree2, inputChars, strategy, workers, False)[1]
+
+def statementInputs(statement:str):
+    # The sorted inputs used by a statement, each input once
+    return sorted(set(statement) & PossibleInputs)
+
+def compareTrees(tree1, tree2, inputChars:list, strategy="bits", workers=None, count=True):
+    
+    '''
+    Runs a comparison strategy on two trees. Returns the fail count along with
+    the failures, a generator of the failing input dictionaries. Without count
+    the strategies that would need the whole truth table to count failures
+    return None as the count and only find failures as they're read.
+    '''
+    
+    if strategy == "bits":
+        return compareBits(tree1, tree2, inputChars, count)
+    elif strategy == "gray":
+        return compareBits(tree1, tree2, inputChars, count, grayChunks)
+    elif strategy == "auto":
+        return compareSimulated(tree1, tree2, inputChars, count)
+    elif strategy == "aig":
+        return compareAIG(tree1, tree2, inputChars)
+    elif strategy == "bdd":
+        return compareBDD(tree1, tree2, inputChars)
+    elif strategy == "sat":
+        return compareSAT(tree1, tree2, inputChars)
+    elif strategy == "parallel":
+        return compareParallel(tree1, tree2, inputChars, workers, not count)
+    elif strategy == "rows":
+        if count:
+            failures = list(compareRows(tree1, tree2, inputChars))
+            return len(failures), iter(failures)
+        return None, compareRows(tree1, tree2, inputChars)
+    else:
+        raise ValueError("Unknown compare strategy: {}".format(strategy))
+
+def compareBits(tree1, tree2, inputChars:list, count=True, chunks=tableChunks):
+    
+    '''
+    Bit-parallel comparison of two trees. Both truth tables are evaluated a chunk
+    at a time, the tables are then equivalent exactly when they're equal and the
+    failing rows are the bits set in their XOR. Returns the failure count (None
+    without count) along with a generator of the failing input dictionaries.
+    Chunks are evaluated by tableChunks unless another generator like it, such as
+    grayChunks, is given.
+    '''
+    
+    # Counted chunk by chunk, failures are only re-evaluated if they're read
+    fails = None
+    if count:
+        fails = sum([bits.bit_count() for first, bits, chunkVars in chunks([tree1, tree2], inputChars)])
+    
+    failures = (dict(zip(inputChars, rowValues(first + row, len(inputChars))))
+                for first, bits, chunkVars in chunks([tree1, tree2], inputChars)
+                for row in tableRows(bits, chunkVars))
+    
+    return fails, failures
+
+def compareAIG(tree1, tree2, inputChars:list):
+    
+    '''
+    Comparison of two trees on a shared And-Inverter Graph. Trees that hash to
+    the same literal are equivalent without evaluating anything, otherwise every
+    distinct subterm of both trees is evaluated once bit-parallel.
+    '''
+    
+    graph = AIG()
+    literal1 = graph.addTree(tree1)
+    literal2 = graph.addTree(tree2)
+    
+    if literal1 == literal2:
+        return tableFailures(0, inputChars)
+    
+    patterns, mask = inputPatterns(inputChars)
+    start = time.perf_counter() if Stats.enabled else None
+    table1, table2 = graph.evalBits([literal1, literal2], patterns, mask)
+    if start != None:
+        Stats.counted(start, [{"*":sum([1 for node in graph.nodes if type(node) == tuple])}])
+    return tableFailures(table1 ^ table2, inputChars)
+
+def compareBDD(tree1, tree2, inputChars:list):
+    
+    '''
+    Comparison of two trees as binary decision diagrams. The diagrams are canonical
+    so the trees are equivalent exactly when they build the same node, failures are
+    read from the diagram of the two trees XORed together. Diagrams that grow past
+    SiftNodes are sifted while they're built.
+    '''
+    
+    start = time.perf_counter() if Stats.enabled else None
+    diagram = BDD(variableOrder([tree1, tree2], inputChars), SiftNodes)
+    root1 = diagram.addTree(tree1)
+    root2 = diagram.addTree(tree2, [root1])
+    
+    fails = 0
+    if root1 != root2:
+        difference = diagram.Xor(root1, root2)
+        fails = diagram.satCount(difference)
+    if start != None:
+        Stats.counted(start, [Stats.operatorCounts(tree1), Stats.operatorCounts(tree2)])
+    
+    if fails == 0:
+        return 0, iter(())
+    return fails, diagram.satisfying(difference, inputChars)
+
+def compareSAT(tree1, tree2, inputChars:list):
+    
+    '''
+    Comparison of two trees with the SAT solver. Both trees are encoded into one
+    solver along with their XOR (a miter), the miter is satisfiable exactly when
+    the trees differ and a satisfying assignment is a failure. Only that one
+    failure is found so the fail count is returned as None.
+    '''
+    
+    start = time.perf_counter() if Stats.enabled else None
+    solver = SATSolver()
+    inputVars = {char:solver.newVar() for char in inputChars}
+    literal1 = tseitin(tree1, solver, inputVars)
+    literal2 = tseitin(tree2, solver, inputVars)
+    
+    # Miter output is true where the trees differ
+    miter = solver.newVar()
+    solver.addClause([-miter, literal1, literal2])
+    solver.addClause([-miter, -literal1, -literal2])
+    solver.addClause([miter, -literal1, literal2])
+    solver.addClause([miter, literal1, -literal2])
+    solver.addClause([miter])
+    
+    satisfiable = solver.solve()
+    if start != None:
+        Stats.counted(start, [Stats.operatorCounts(tree1), Stats.operatorCounts(tree2)])
+    
+    if not satisfiable:
+        return 0, iter(())
+    
+    failure = {char:int(solver.model[inputVars[char]]) for char in inputChars}
+    return None, iter([failure])
+
+def simulationPatterns(inputChars:list, rows=None, seed=0):
+    
+    '''
+    Random bit-parallel input patterns for simulation, rows random rows packed
+    into one integer per input like the patterns of inputPatterns. Each input's
+    pattern is seeded by its name alone so an input gets the same pattern in
+    every statement.
+    '''
+    
+    if rows == None:
+        rows = SimulationRows
+    return {char:random.Random("{}/{}".format(seed, char)).getrandbits(rows) for char in inputChars}
+
+def fingerprint(tree, inputChars:list=None, rows=None, seed=0):
+    
+    '''
+    Simulation fingerprint of a tree (or statement), its outputs on rows seeded
+    random rows as the bits of an integer. Equivalent expressions always have the
+    same fingerprint, so different fingerprints prove expressions differ and
+    equal fingerprints make them candidates for a full check. Inputs default to
+    the ones the tree uses.
+    '''
+    
+    if rows == None:
+        rows = SimulationRows
+    if type(tree) == str:
+        tree = cachedTree(tree)
+    if inputChars == None:
+        inputChars = sorted(tree.getSupport())
+    
+    patterns = simulationPatterns(inputChars, rows, seed)
+    function = compileTree(tree, inputChars)
+    args = [patterns[char] for char in inputChars]
+    
+    if not Stats.enabled:
+        return function(*args, mask=(1 << rows) - 1)
+    
+    start = time.perf_counter()
+    table = function(*args, mask=(1 << rows) - 1)
+    Stats.evaluated([tree], inputChars, args, (1 << rows) - 1, start)
+    return table
+
+def fingerprintBuckets(statements:list, rows=None, seed=0):
+    
+    '''
+    Groups statements into candidate equivalence classes by their fingerprints,
+    one pass over the statements rather than comparing every pair. Statements in
+    different buckets are never equivalent, statements sharing a bucket are very
+    likely to be and only need checking against each other. Returns the buckets
+    as lists of statements in the order they were first seen.
+    '''
+    
+    buckets = {}
+    for statement in statements:
+        buckets.setdefault(fingerprint(statement, None, rows, seed), []).append(statement)
+    return list(buckets.values())
+
+def compareSimulated(tree1, tree2, inputChars:list, count=True):
+    
+    '''
+    Comparison that first simulates both trees on SimulationRows random rows.
+    Trees that differ there are refuted straight away, the fail count is then
+    None and the failures are the distinct simulated rows where they differ.
+    Trees with matching fingerprints are handed to the bits strategy with up to
+    ExhaustiveBits inputs and to the bdd strategy past that.
+    '''
+    
+    patterns = simulationPatterns(inputChars)
+    difference = fingerprint(tree1, inputChars) ^ fingerprint(tree2, inputChars)
+    
+    if difference == 0:
+        if len(inputChars) <= ExhaustiveBits:
+            return compareBits(tree1, tree2, inputChars, count)
+        return compareBDD(tree1, tree2, inputChars)
+    
+    def failures():
+        found = set()
+        bits = format(difference, "b")[::-1]
+        row = bits.find("1")
+        while row != -1:
+            values = tuple([(patterns[char] >> row) & 1 for char in inputChars])
+            if values not in found:
+                found.add(values)
+                yield dict(zip(inputChars, values))
+            row = bits.find("1", row + 1)
+    
+    return None, failures()
+
+# State of a shard worker process, set once by its initializer
+ShardWorker = {}
+
+def initShardWorker(trees:list, inputChars:list, shardBits:int, memoryName:str, cancelled):
+    # Trees arrive pickled and are compiled once per worker
+    ShardWorker["functions"] = [compileTree(tree, inputChars) for tree in trees]
+    ShardWorker["inputChars"] = inputChars
+    ShardWorker["shardBits"] = shardBits
+    ShardWorker["memory"] = shared_memory.SharedMemory(name=memoryName)
+    ShardWorker["cancelled"] = cancelled
+
+def evalShardWorker(prefix:int):
+    
+    '''
+    Evaluates one shard in a worker, the table of a single tree or the XOR of two
+    trees. The shard is written into its block of the shared table and the set
+    bit count along with the first set row is returned.
+    '''
+    
+    if ShardWorker["cancelled"].is_set():
+        return 0, None
+    
+    args, mask = shardInputs(ShardWorker["inputChars"], ShardWorker["shardBits"], prefix)
+    bits = 0
+    for function in ShardWorker["functions"]:
+        bits ^= function(*args, mask=mask)
+    
+    size = (mask.bit_length()) // 8
+    ShardWorker["memory"].buf[prefix * size:(prefix + 1) * size] = bits.to_bytes(size, "little")
+    
+    first = None
+    if bits:
+        first = prefix * mask.bit_length() + (bits & -bits).bit_length() - 1
+    return bits.bit_count(), first
+
+def parallelTable(trees:list, inputChars:list, workers=None, shardBits=None, stopOnSet=False):
+    
+    '''
+    Evaluates the truth table of one tree, or the XOR of two, across a pool of worker
+    processes. The table is split into shards by fixing the first shardBits inputs,
+    each worker writes its shards into one table in shared memory. With stopOnSet the
+    pool is cancelled as soon as any shard has a set row, for when only a yes/no answer
+    is needed. Returns the table (None when stopped early), the set row count and the
+    first set row found.
+    '''
+    
+    if workers == None:
+        workers = os.cpu_count() or 1
+    
+    # Shards must be whole bytes of the table, small tables are a single shard
+    if shardBits == None:
+        shardBits = (4 * workers - 1).bit_length()
+    shardBits = max(0, min(shardBits, len(inputChars) - 3))
+    
+    if len(inputChars) < 3:
+        # Not worth starting processes for
+        table = 0
+        for tree in trees:
+            table ^= tableBits(tree, inputChars)
+        return table, table.bit_count(), next(tableRows(table, len(inputChars)), None)
+    
+    size = (1 << len(inputChars)) // 8
+    memory = shared_memory.SharedMemory(create=True, size=size)
+    context = multiprocessing.get_context()
+    cancelled = context.Event()
+    
+    count = 0
+    first = None
+    stopped = False
+    
+    try:
+        with concurrent.futures.ProcessPoolExecutor(workers, mp_context=context, initializer=initShardWorker,
+                                                    initargs=(trees, inputChars, shardBits, memory.name, cancelled)) as pool:
+            futures = [pool.submit(evalShardWorker, prefix) for prefix in range(1 << shardBits)]
+            
+            for future in concurrent.futures.as_completed(futures):
+                shardCount, shardFirst = future.result()
+                count += shardCount
+                if shardFirst != None and (first == None or shardFirst < first):
+                    first = shardFirst
+                
+                if stopOnSet and count:
+                    # Workers skip any shard they pick up from now on
+                    stopped = True
+                    cancelled.set()
+                    for other in futures:
+                        other.cancel()
+                    break
+        
+        table = None if stopped else int.from_bytes(memory.buf[:size], "little")
+    finally:
+        memory.close()
+        memory.unlink()
+    
+    return table, count, first
+
+def compareParallel(tree1, tree2, inputChars:list, workers=None, stopOnFirst=False):
+    
+    '''
+    Comparison of two trees with the table split across worker processes. When
+    stopOnFirst is set the workers are cancelled at the first failure and only
+    that failure is returned, the fail count is then None.
+    '''
+    
+    difference, fails, first = parallelTable([tree1, tree2], inputChars, workers, stopOnSet=stopOnFirst)
+    
+    if difference == None:
+        return None, iter([dict(zip(inputChars, rowValues(first, len(inputChars))))])
+    return tableFailures(difference, inputChars)
+
+def tableFailures(difference:int, inputChars:list):
+    # Failure count and a generator of the failing input dictionaries
+    failures = (dict(zip(inputChars, rowValues(row, len(inputChars))))
+                for row in tableRows(difference, len(inputChars)))
+    return difference.bit_count(), failures
+
+def compareRows(tree1, tree2, inputChars:list):
+    
+    '''
+    Row by row comparison of two trees, each combination of inputs is built into
+    an input dictionary and both trees are evaluated against it. Yields the input
+    dictionary of each failing row.
+    '''
+    
+    # Both trees are compiled so each row costs one call per tree
+    function1 = compileTree(tree1, inputChars)
+    function2 = compileTree(tree2, inputChars)
+    
+    # Rows are recorded up to each failure, counted from the failing row's number
+    # so the loop itself does no extra work
+    start = time.perf_counter() if Stats.enabled else None
+    recorded = 0
+    
+    # Iterate through combinations
+    for comb in itertools.product([0, 1], repeat=len(inputChars)):
+        # Compare statements for generated input
+        if function1(*comb) != function2(*comb):
+            if start != None:
+                row = int("".join([str(val) for val in comb]) or "0", 2) + 1
+                Stats.counted(start, [Stats.operatorCounts(tree1), Stats.operatorCounts(tree2)], row - recorded)
+                recorded = row
+            yield dict(zip(inputChars, comb))
+            start = time.perf_counter() if Stats.enabled else None
+    
+    if start != None:
+        Stats.counted(start, [Stats.operatorCounts(tree1), Stats.operatorCounts(tree2)],
+                      (1 << len(inputChars)) - recorded)
+
+# Functions of up to this many inputs are minimized exactly
+ExactMinimizeBits = 10
+
+# Largest product Petrick's method expands before settling for a greedy cover
+PetrickLimit = 512
+
+def cubeText(cube:tuple, inputChars:list):
+    # A cube as a product term, input i is bit n - 1 - i of the cube
+    value, care = cube
+    term = ""
+    for i,char in enumerate(inputChars):
+        bit = 1 << (len(inputChars) - 1 - i)
+        if care & bit:
+            term += char if value & bit else char + "'"
+    return term or "1"
+
+def cubeLiterals(cube:tuple):
+    return cube[1].bit_count()
+
+def primeImplicants(minterms:list, count:int):
+    
+    '''
+    Quine-McCluskey prime implicant generation. Implicants are cubes, a pair of bit
+    masks where care marks the inputs in the term and value holds their polarity.
+    Cubes with the same care mask that differ in one cared for input are merged
+    into a cube without that input, any cube that can't be merged is prime.
+    '''
+    
+    full = (1 << count) - 1
+    current = set([(minterm, full) for minterm in minterms])
+    primes = set()
+    
+    while current:
+        merged = set()
+        used = set()
+        for value, care in current:
+            bits = care
+            while bits:
+                bit = bits & -bits
+                bits ^= bit
+                partner = (value ^ bit, care)
+                if partner in current:
+                    merged.add((value & ~bit, care & ~bit))
+                    used.add((value, care))
+        primes |= current - used
+        current = merged
+    
+    return list(primes)
+
+def petrick(primes:list, minterms:list):
+    
+    '''
+    Picks the primes to cover the minterms. Essential primes are taken first, the
+    rest of the cover comes from Petrick's method, expanding the product of the
+    sums of primes covering each minterm and keeping the cheapest product term.
+    If the expansion grows past PetrickLimit terms the cover is finished greedily.
+    '''
+    
+    covers = {minterm:[i for i,(value, care) in enumerate(primes) if minterm & care == value]
+              for minterm in minterms}
+    
+    chosen = set()
+    for minterm, options in covers.items():
+        if len(options) == 1:
+            chosen.add(options[0])
+    
+    remaining = [minterm for minterm in minterms
+                 if not any(minterm & primes[i][1] == primes[i][0] for i in chosen)]
+    
+    # Product terms are bit masks of prime indices
+    products = [0]
+    for minterm in remaining:
+        options = sum([1 << i for i in covers[minterm]])
+        expanded = set()
+        for product in products:
+            if product & options:
+                expanded.add(product)
+            else:
+                for i in covers[minterm]:
+                    expanded.add(product | (1 << i))
+        
+        # Absorption, a product containing another is never cheaper
+        products = []
+        for product in sorted(expanded, key=int.bit_count):
+            if not any(other & product == other for other in products):
+                products.append(product)
+        
+        if len(products) > PetrickLimit:
+            return sorted(chosen | greedyCover(primes, covers, remaining))
+    
+    cost = lambda product: (product.bit_count(), sum([cubeLiterals(primes[i]) for i in range(len(primes)) if product >> i & 1]))
+    best = min(products, key=cost)
+    return sorted(chosen | set([i for i in range(len(primes)) if best >> i & 1]))
+
+def greedyCover(primes:list, covers:dict, minterms:list):
+    # Repeatedly takes the prime covering most of what's left, then the fewest literals
+    chosen = set()
+    remaining = set(minterms)
+    while remaining:
+        counts = {}
+        for minterm in remaining:
+            for i in covers[minterm]:
+                counts[i] = counts.get(i, 0) + 1
+        best = max(counts, key=lambda i: (counts[i], -cubeLiterals(primes[i])))
+        chosen.add(best)
+        remaining = set([minterm for minterm in remaining if minterm & primes[best][1] != primes[best][0]])
+    return chosen
+
+class CubeCover():
+    
+    '''
+    Espresso style heuristic minimization over a bit-parallel truth table. The cover
+    starts from the paths of the function's decision diagram and is improved by
+    repeating expand (drop literals while the cube stays inside the on-set),
+    irredundant (drop cubes covered by the rest) and reduce (shrink each cube to
+    the rows only it covers) until the cost stops improving. Rows covered by a cube
+    are found with bitwise operations over the input patterns.
+    '''
+    
+    def __init__(self, table:int, inputChars:list):
+        self.inputChars = inputChars
+        self.count = len(inputChars)
+        patterns, self.mask = inputPatterns(inputChars)
+        self.positive = [patterns[char] for char in inputChars]
+        self.negative = [self.mask ^ pattern for pattern in self.positive]
+        self.on = table
+        self.off = self.mask ^ table
+    
+    def rows(self, cube:tuple):
+        # Every row of the table inside a cube
+        value, care = cube
+        rows = self.mask
+        for i in range(self.count):
+            bit = 1 << (self.count - 1 - i)
+            if care & bit:
+                rows &= self.positive[i] if value & bit else self.negative[i]
+        return rows
+    
+    def supercube(self, rows:int):
+        # Smallest cube containing every given row
+        value = care = 0
+        for i in range(self.count):
+            bit = 1 << (self.count - 1 - i)
+            if rows & self.negative[i] == 0:
+                value |= bit
+                care |= bit
+            elif rows & self.positive[i] == 0:
+                care |= bit
+        return value, care
+    
+    def expand(self, cubes:list):
+        # Largest cubes first, cubes inside an already expanded cube are dropped
+        expanded = []
+        for value, care in sorted(cubes, key=cubeLiterals):
+            if any(care & bigCare == bigCare and value & bigCare == bigValue for bigValue, bigCare in expanded):
+                continue
+            bits = care
+            while bits:
+                bit = bits & -bits
+                bits ^= bit
+                if self.rows((value & ~bit, care & ~bit)) & self.off == 0:
+                    value, care = value & ~bit, care & ~bit
+            expanded.append((value, care))
+        return expanded
+    
+    def irredundant(self, cubes:list):
+        
+        '''
+        Cubes covering rows no other cube covers are kept, the rest are kept largest
+        first only if they still cover something the kept cubes don't.
+        '''
+        
+        rows = [self.rows(cube) for cube in cubes]
+        
+        # Union of every cube but one from running unions in both directions
+        before = [0]
+        for cubeRows in rows:
+            before.append(before[-1] | cubeRows)
+        after = [0]
+        for cubeRows in reversed(rows):
+            after.append(after[-1] | cubeRows)
+        after.reverse()
+        
+        kept = []
+        covered = 0
+        optional = []
+        for i,cube in enumerate(cubes):
+            if rows[i] & ~(before[i] | after[i + 1]):
+                kept.append(cube)
+                covered |= rows[i]
+            else:
+                optional.append(i)
+        
+        for i in sorted(optional, key=lambda i: cubeLiterals(cubes[i])):
+            if rows[i] & ~covered:
+                kept.append(cubes[i])
+                covered |= rows[i]
+        
+        return kept
+    
+    def reduce(self, cubes:list):
+        # Each cube shrinks to the rows that neither earlier reduced cubes nor
+        # later cubes cover, a cube with no such rows is dropped
+        rows = [self.rows(cube) for cube in cubes]
+        after = [0]
+        for cubeRows in reversed(rows):
+            after.append(after[-1] | cubeRows)
+        after.reverse()
+        
+        reduced = []
+        before = 0
+        for i in range(len(cubes)):
+            unique = rows[i] & ~(before | after[i + 1])
+            if unique:
+                cube = self.supercube(unique)
+                reduced.append(cube)
+                before |= self.rows(cube)
+        return reduced
+    
+    def cost(self, cubes:list):
+        return len(cubes), sum([cubeLiterals(cube) for cube in cubes])
+    
+    def minimize(self, cubes:list, rounds=8):
+        cubes = self.irredundant(self.expand(cubes))
+        for i in range(rounds):
+            attempt = self.irredundant(self.expand(self.reduce(cubes)))
+            if self.cost(attempt) >= self.cost(cubes):
+                break
+            cubes = attempt
+        return cubes
+
+def minimize(tree:Node, inputChars:list, table:int=None):
+    
+    '''
+    Minimal sum-of-products cover of a tree as a list of cubes. Functions of up to
+    ExactMinimizeBits inputs are minimized exactly with Quine-McCluskey and Petrick's
+    method, larger ones use the Espresso style heuristic.
+    '''
+    
+    if table == None:
+        table = tableBits(tree, inputChars)
+    count = len(inputChars)
+    
+    if count <= ExactMinimizeBits:
+        minterms = list(tableRows(table, count))
+        primes = primeImplicants(minterms, count)
+        return [primes[i] for i in petrick(primes, minterms)]
+    
+    # Heuristic cover starts from the disjoint paths of the decision diagram
+    diagram = BDD(inputChars)
+    cubes = []
+    for path in diagram.paths(diagram.addTree(tree)):
+        value = care = 0
+        for char,val in path.items():
+            bit = 1 << (count - 1 - inputChars.index(char))
+            care |= bit
+            value |= bit if val else 0
+        cubes.append((value, care))
+    
+    return CubeCover(table, inputChars).minimize(cubes)
+
+def simplify(statement:str):
+    
+    '''
+    Simplifies a statement to a minimal sum of products, ie AB+AB' is A. Returns
+    the simplified statement, 0 if it's never true and 1 if it's always true.
+    '''
+    
+    inputChars = statementInputs(statement)
+    tree = cachedTree(statement)
+    table = cachedTable(statement, inputChars) if len(inputChars) <= CachedTableBits else None
+    
+    cubes = minimize(tree, inputChars, table)
+    if len(cubes) == 0:
+        return "0"
+    return "+".join([cubeText(cube, inputChars) for cube in cubes])
+
+class StepChecker():
+    
+    '''
+    Step checking session for a simplification. The initial expression is parsed
+    and evaluated once and its signature kept, each step is then only evaluated
+    once and checked against the initial expression and against the step before
+    it, so a broken step is pinned to exactly where it happened. Signatures are
+    truth tables, nodes of one shared decision diagram with the bdd strategy or
+    the trees themselves with the sat strategy.
+    '''
+    
+    def __init__(self, initExpr:str, strategy="bits", workers=None):
+        if strategy not in ["bits", "rows", "aig", "bdd", "sat", "parallel", "gray", "auto"]:
+            raise ValueError("Unknown compare strategy: {}".format(strategy))
+        
+        self.workers = workers
+        self.inputChars = statementInputs(initExpr)
+        
+        if strategy == "auto":
+            # Signatures are kept for every step so they're exact, tables while
+            # they're small enough to cache and decision diagrams after that
+            strategy = "bits" if len(self.inputChars) <= CachedTableBits else "bdd"
+        self.strategy = strategy
+        self.diagram = BDD(self.inputChars)
+        
+        self.step = 0
+        self.initial = cachedTree(initExpr)
+        self.previous = self.initial
+        self.initialSignature = self.signature(self.initial)
+        self.previousSignature = self.initialSignature
+        
+        # Inputs where the last step differed from the one before it
+        self.failure = None
+    
+    def signature(self, tree:Node):
+        if self.strategy == "bdd":
+            return self.diagram.addTree(tree)
+        elif self.strategy == "sat":
+            return tree
+        elif self.strategy == "parallel":
+            return parallelTable([tree], self.inputChars, self.workers)[0]
+        elif self.strategy == "gray":
+            return grayTable([tree], self.inputChars)
+        return tableBits(tree, self.inputChars)
+    
+    def difference(self, signature1, signature2):
+        # Inputs where two signatures differ, or None if they're equivalent
+        if self.strategy == "sat":
+            return next(compareSAT(signature1, signature2, self.inputChars)[1], None)
+        elif self.strategy == "bdd":
+            return self.diagram.pickOne(self.diagram.Xor(signature1, signature2))
+        
+        row = next(tableRows(signature1 ^ signature2, len(self.inputChars)), None)
+        if row == None:
+            return None
+        return dict(zip(self.inputChars, rowValues(row, len(self.inputChars))))
+    
+    def extend(self, inputChars:list):
+        # A step brought in new inputs, the kept signatures are rebuilt over them
+        self.inputChars = sorted(set(self.inputChars) | set(inputChars))
+        self.diagram = BDD(self.inputChars)
+        self.initialSignature = self.signature(self.initial)
+        self.previousSignature = self.signature(self.previous)
+    
+    def check(self, expr:str):
+        
+        '''
+        Checks the next step. Returns whether it's equivalent to the initial
+        expression and whether it's equivalent to the previous step, when it isn't
+        equivalent to the previous step failure holds inputs that show it.
+        '''
+        
+        tree = cachedTree(expr)
+        if not set(statementInputs(expr)) <= set(self.inputChars):
+            self.extend(statementInputs(expr))
+        
+        signature = self.signature(tree)
+        
+        self.failure = self.difference(self.previousSignature, signature)
+        matchesPrevious = self.failure == None
+        
+        if self.previous is self.initial:
+            matchesInitial = matchesPrevious
+        else:
+            matchesInitial = self.difference(self.initialSignature, signature) == None
+        
+        self.step += 1
+        self.previous = tree
+        self.previousSignature = signature
+        
+        return matchesInitial, matchesPrevious
+
+class TableWriter():
+    
+    '''
+    Buffered writer for truth tables. The "text" format matches the printed table,
+    "csv" is comma separated with a header row and "binary" is the packed table,
+    a b"BATT" header with the input count and characters followed by the output
+    column a bit per row (row r is bit r % 8 of byte r // 8). Rows are written a
+    chunk at a time, the text of the inputs that vary within a chunk is the same
+    for every chunk so it's only built once.
+    '''
+    
+    def __init__(self, stream, inputChars:list, outputs=["X"], format="text"):
+        if format not in ["text", "csv", "binary"]:
+            raise ValueError("Unknown table format: {}".format(format))
+        if format == "binary" and len(outputs) != 1:
+            raise ValueError("Binary tables have a single output")
+        
+        self.stream = stream
+        self.inputChars = inputChars
+        self.format = format
+        self.separator = "," if format == "csv" else " "
+        self.middle = "" if format == "csv" else "| "
+        self.suffixes = {}
+        self.pending = 0 # Bits of a binary table too short to fill a byte
+        
+        if format == "binary":
+            self.stream.write(b"BATT" + bytes([len(inputChars)]) + "".join(inputChars).encode())
+        else:
+            self.stream.write(self.rowText(inputChars) + self.middle + self.separator.join(outputs) + "\n")
+    
+    def rowText(self, values:list):
+        return "".join([str(val) + self.separator for val in values])
+    
+    def write(self, first:int, chunkVars:int, tables:list):
+        # Writes a chunk of rows starting at row first, one table per output
+        size = 1 << chunkVars
+        
+        if self.format == "binary":
+            if size >= 8:
+                self.stream.write(tables[0].to_bytes(size // 8, "little"))
+            else:
+                self.pending |= tables[0] << first
+                if first + size == 1 << len(self.inputChars):
+                    self.stream.write(bytes([self.pending]))
+            return
+        
+        if chunkVars not in self.suffixes:
+            self.suffixes[chunkVars] = [self.rowText(values) + self.middle
+                                        for values in itertools.product([0, 1], repeat=chunkVars)]
+        suffixes = self.suffixes[chunkVars]
+        
+        prefix = self.rowText(rowValues(first >> chunkVars, len(self.inputChars) - chunkVars))
+        columns = [format(table, "0{}b".format(size))[::-1] for table in tables]
+        if len(columns) == 1:
+            values = columns[0]
+        else:
+            values = map(self.separator.join, zip(*columns))
+        
+        # Every row is the chunk's prefix, the row's suffix and its outputs
+        rows = ("\n" + prefix).join(map(str.__add__, suffixes, values))
+        self.stream.write(prefix + rows + "\n")
+
+def tableFormat(path:str):
+    # Output format picked from the extension of a path
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    elif extension in [".bin", ".batt"]:
+        return "binary"
+    return "text"
+
+def truthTable(statement:str, workers=1, output:str=None, format:str=None, strategy="bits"):
+    
+    '''
+    Writes the truth table of a statement, to the screen by default or to the file
+    at output. The table is evaluated and written a chunk at a time so the memory
+    used doesn't grow with the size of the table. The format defaults to one picked
+    from the output's extension (.csv or .bin). With more than one worker the table
+    is evaluated across that many processes, the "gray" strategy evaluates it in
+    Gray code order with incremental evaluation.
+    '''
+    
+    inputChars = []
+    
+    # statement1 is assumed to have more or equivalent inputs than statement2
+    for char in statement:
+        if char not in inputChars and char in PossibleInputs:
+            inputChars.append(char) 
+        
+    # Sort to make sure inputs are kept inline
+    inputChars.sort()
+    
+    if strategy == "gray":
+        chunks = grayChunks([cachedTree(statement)], inputChars)
+    elif workers > 1:
+        chunks = splitTable(parallelTable([cachedTree(statement)], inputChars, workers)[0], len(inputChars))
+    elif Store != None:
+        chunks = splitPacked(Store.table(statement, inputChars), len(inputChars))
+    elif len(inputChars) <= CachedTableBits:
+        chunks = splitTable(cachedTable(statement, inputChars), len(inputChars))
+    else:
+        chunks = tableChunks([cachedTree(statement)], inputChars)
+    
+    if format == None:
+        format = "text" if output == None else tableFormat(output)
+    
+    if output == None:
+        stream = sys.stdout
+    elif format == "binary":
+        stream = open(output, "wb", buffering=1 << 20)
+    else:
+        stream = open(output, "w", buffering=1 << 20)
+    
+    try:
+        writer = TableWriter(stream, inputChars, format=format)
+        for first, bits, chunkVars in chunks:
+            writer.write(first, chunkVars, [bits])
+    finally:
+        if output != None:
+            stream.close()
+
+def forestChunks(statements:list, inputChars:list, chunkBits=None):
+    
+    '''
+    Generator evaluating the truth tables of several statements together. Every
+    statement is added to one And-Inverter Graph so subexpressions they share
+    are merged, the graph is compiled once and each chunk of rows is evaluated
+    in a single pass for all of them. Yields the first row of the chunk, a list
+    with each statement's table of the chunk and the number of inputs that vary
+    within the chunk.
+    '''
+    
+    if chunkBits == None:
+        chunkBits = ChunkBits
+    if len(statements) == 0:
+        raise ValueError("Expected at least one statement")
+    
+    forest = AIG()
+    literals = [forest.addTree(cachedTree(statement)) for statement in statements]
+    function = forest.compile(literals, inputChars)
+    shardBits = max(0, len(inputChars) - chunkBits)
+    chunkVars = len(inputChars) - shardBits
+    
+    for prefix in range(1 << shardBits):
+        args, mask = shardInputs(inputChars, shardBits, prefix)
+        yield prefix << chunkVars, list(function(*args, mask=mask)), chunkVars
+
+def refineGroups(groups:list, tables:list):
+    # Splits groups of output indices so outputs stay together only while
+    # their tables match
+    refined = []
+    for group in groups:
+        split = {}
+        for index in group:
+            split.setdefault(tables[index], []).append(index)
+        refined.extend(split.values())
+    return refined
+
+def truthTables(statements:list, output:str=None, format:str=None):
+    
+    '''
+    Writes the truth tables of several statements as one table over all of their
+    inputs, with an output column for each statement (X1 to Xn). The tables are
+    evaluated together by forestChunks and written a chunk at a time like
+    truthTable. Returns the statements grouped into sets of equivalent statements,
+    in the order they were given.
+    '''
+    
+    if len(statements) == 0:
+        raise ValueError("Expected at least one statement")
+    inputChars = sorted(set().union(*[statementInputs(statement) for statement in statements]))
+    groups = [list(range(len(statements)))]
+    
+    if format == None:
+        format = "text" if output == None else tableFormat(output)
+    
+    if output == None:
+        stream = sys.stdout
+    elif format == "binary":
+        stream = open(output, "wb", buffering=1 << 20)
+    else:
+        stream = open(output, "w", buffering=1 << 20)
+    
+    try:
+        writer = TableWriter(stream, inputChars, ["X{}".format(i + 1) for i in range(len(statements))], format)
+        for first, tables, chunkVars in forestChunks(statements, inputChars):
+            writer.write(first, chunkVars, tables)
+            groups = refineGroups(groups, tables)
+    finally:
+        if output != None:
+            stream.close()
+    
+    return [[statements[index] for index in group] for group in groups]
+
+def equivalentGroups(statements:list):
+    # Groups statements into sets of equivalent statements, evaluated together
+    # like truthTables without writing the table
+    if len(statements) == 0:
+        raise ValueError("Expected at least one statement")
+    inputChars = sorted(set().union(*[statementInputs(statement) for statement in statements]))
+    groups = [list(range(len(statements)))]
+    for first, tables, chunkVars in forestChunks(statements, inputChars):
+        groups = refineGroups(groups, tables)
+    return [[statements[index] for index in group] for group in groups]
+
+def splitTable(table:int, count:int, chunkBits=None):
+    # Splits a full bit-parallel table into the chunks tableChunks would yield
+    return splitPacked(table.to_bytes(max(1, (1 << count) // 8), "little"), count, chunkBits)
+
+def splitPacked(packed, count:int, chunkBits=None):
+    # Splits a packed table (row r is bit r % 8 of byte r // 8) into the chunks
+    # tableChunks would yield, packed can be any bytes-like object
+    if chunkBits == None:
+        chunkBits = ChunkBits
+    chunkVars = min(count, max(chunkBits, 3))
+    
+    if chunkVars < 3:
+        # Too small to split into bytes
+        yield 0, int.from_bytes(packed, "little") & ((1 << (1 << count)) - 1), count
+        return
+    
+    size = (1 << chunkVars) // 8
+    for i in range(0, len(packed), size):
+        yield i * 8, int.from_bytes(packed[i:i + size], "little"), chunkVars
+
+def packedFailures(packed1, packed2, inputChars:list, count=True):
+    
+    '''
+    Compares two packed tables a chunk at a time. Returns the failure count (None
+    without count) along with a generator of the failing input dictionaries, like
+    compareBits.
+    '''
+    
+    fails = None
+    if count:
+        fails = sum([(bits1 ^ bits2).bit_count() for (first, bits1, chunkVars), (first, bits2, chunkVars)
+                     in zip(splitPacked(packed1, len(inputChars)), splitPacked(packed2, len(inputChars)))])
+    
+    failures = (dict(zip(inputChars, rowValues(first + row, len(inputChars))))
+                for (first, bits1, chunkVars), (first, bits2, chunkVars)
+                in zip(splitPacked(packed1, len(inputChars)), splitPacked(packed2, len(inputChars)))
+                for row in tableRows(bits1 ^ bits2, chunkVars))
+    
+    return fails, failures
+
+class TableStore():
+    
+    '''
+    On-disk store of truth tables shared across runs and processes. Each table is
+    its own file in directory named by the SHA-256 of the cache key of the
+    statement and the order of its inputs, the file is the binary TableWriter
+    format so it can be read as a table output too. Tables are read through a
+    read-only memory map and returned as a memoryview of the packed bits, nothing
+    is copied until the bits are used.
+    
+    Files are written to a temporary file and renamed into place, so readers only
+    ever see whole tables and a file is never changed once written, any number of
+    processes can read and fill the store at once. Reading a table marks it as
+    recently used and once the files are over maxBytes the least recently used
+    are deleted, mappings already open stay valid.
+    '''
+    
+    Extension = ".batt"
+    
+    def __init__(self, directory:str, maxBytes=1 << 30):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+    
+    def path(self, statement:str, inputChars:list):
+        key = Cache.key(statement) + "|" + "".join(inputChars)
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + self.Extension)
+    
+    def header(self, inputChars:list):
+        return b"BATT" + bytes([len(inputChars)]) + "".join(inputChars).encode()
+    
+    def get(self, statement:str, inputChars:list):
+        # The stored table as a memoryview of its packed bits, or None
+        path = self.path(statement, inputChars)
+        header = self.header(inputChars)
+        length = len(header) + max(1, (1 << len(inputChars)) // 8)
+        
+        try:
+            with open(path, "rb") as file:
+                if os.fstat(file.fileno()).st_size != length:
+                    return None
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        
+        if mapped[:len(header)] != header:
+            mapped.close()
+            return None
+        
+        try:
+            # Marks the table as recently used for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        
+        return memoryview(mapped)[len(header):]
+    
+    def put(self, statement:str, inputChars:list, chunks):
+        # Writes a table from chunks like those of tableChunks
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with open(descriptor, "wb", buffering=1 << 20) as stream:
+                writer = TableWriter(stream, inputChars, format="binary")
+                for first, bits, chunkVars in chunks:
+                    writer.write(first, chunkVars, [bits])
+            path = self.path(statement, inputChars)
+            try:
+                os.replace(temporary, path)
+            except PermissionError:
+                # Windows can't replace a file another reader has mapped, the
+                # table there is the same one so it's kept
+                if not os.path.exists(path):
+                    raise
+                os.unlink(temporary)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        
+        self.evict(path)
+    
+    def table(self, statement:str, inputChars:list):
+        
+        '''
+        The packed table of a statement over inputChars, evaluated and stored first
+        if it isn't in the store yet.
+        '''
+        
+        packed = self.get(statement, inputChars)
+        if packed != None:
+            self.hits += 1
+            return packed
+        
+        self.misses += 1
+        self.put(statement, inputChars, self.chunks(statement, inputChars))
+        packed = self.get(statement, inputChars)
+        if packed == None:
+            # Another process evicted it before it was read back, it's evaluated
+            # again in memory rather than failing
+            packed = b"".join([bits.to_bytes(max(1, (1 << chunkVars) // 8), "little")
+                               for first, bits, chunkVars in self.chunks(statement, inputChars)])
+        return packed
+    
+    def chunks(self, statement:str, inputChars:list):
+        # The chunks of a statement's table, from the cache when it's small enough
+        if len(inputChars) <= CachedTableBits:
+            return splitTable(cachedTable(statement, inputChars), len(inputChars))
+        return tableChunks([cachedTree(statement)], inputChars)
+    
+    def files(self):
+        # Stored tables as (modified time, size, path), oldest first
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.Extension):
+                try:
+                    info = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((info.st_mtime, info.st_size, entry.path))
+        return sorted(files)
+    
+    def evict(self, keep:str=None):
+        # Deletes the least recently used tables until the store fits in
+        # maxBytes, the table at keep is never deleted
+        files = self.files()
+        size = sum([entry[1] for entry in files])
+        for modified, length, path in files:
+            if size <= self.maxBytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                # Another process evicted it first
+                pass
+            size -= length
+    
+    def clear(self):
+        for modified, length, path in self.files():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+    
+    def stats(self):
+        files = self.files()
+        return {"hits":self.hits, "misses":self.misses, "tables":len(files),
+                "bytes":sum([entry[1] for entry in files])}
+
+# Table store used by compare and truthTable, off unless useStore is called
+Store = None
+
+def useStore(directory:str, maxBytes=1 << 30):
+    # Stores truth tables in directory from now on, None turns the store off
+    global Store
+    Store = None if directory == None else TableStore(directory, maxBytes)
+    return Store
+
+def repl():
+    
+    '''
+    Interactive command loop, only started when the module is run as a script.
+    '''
+    
+    # Primary loop
+    run = True
+
+    # Strategy used by compare and checksteps
+    strategy = "bits"
+
+    # Initial message
+    print("Boolean Algebra Engine")
+    print("\nType help to get help\n")
+
+    while(run):
+        # Input function
+    
+        func = input("> ")
+        
+        try:
+            if func == "quit":
+                # command to quit the application
+                print("Goodbye!")
+                run = False
+        
+            elif func == "eval":
+                # Command allowing user to evaluate a boolean algebra statement
+                # with defined inputs
+                statement = input("Boolean statement: ")
+                statementTree = cachedTree(statement)
+                inputs = constructInputsDict(statement)
+                function = compileTree(statementTree, list(inputs))
+                args = [int(val) for val in inputs.values()]
+                start = time.perf_counter() if Stats.enabled else None
+                result = function(*args)
+                if start != None:
+                    Stats.evaluated([statementTree], list(inputs), args, 1, start)
+                print(result)
+        
+            elif func == "compare":
+                # Command to compare if two statements are identical based on their
+                # truth tables
+                statement1 = input("Boolean Statement 1: ")
+                statement2 = input("Boolean Statement 2: ")
+        
+                compare(statement1, statement2, strategy=strategy)
+        
+            elif func == "help":
+                print("Commands:")
+                print(" - quit")
+                print("   ~quits")
+                print(" - eval")
+                print("   ~prompts for a boolean statement to be entered and will then")
+                print("    evaluate it to a final value")
+                print(" - compare")
+                print("   ~prompts for two boolean statements to be entered and will then")
+                print("    have their truth tables compared")
+                print(" - table")
+                print("   ~prompts the user to enter a boolean statement, the truth table")
+                print("    for the defined expression will then be generated. An output")
+                print("    path can be given to write the table to a file, .csv files are")
+                print("    comma separated and .bin files are a packed bit per row. Several")
+                print("    statements separated by ; get one table with a column each and")
+                print("    the statements that are equivalent are listed")
+                print(" - checksteps")
+                print("   ~prompts the user to enter a boolean expression, the user will")
+                print("    the be required to enter n more statements and each will be checked")
+                print("    and if an incorrect step is entered the user will be notified")
+                print("    is useful to check working(s) out for a simplification.")
+                print(" - simplify")
+                print("   ~prompts for a boolean statement and simplifies it to a minimal")
+                print("    sum of products")
+                print(" - strategy")
+                print("   ~prompts for the strategy used by compare and checksteps, one of")
+                print("    bits (default), rows, aig, bdd, sat, parallel, gray or auto. bdd and sat")
+                print("    don't walk the truth table and suit statements with many inputs, sat")
+                print("    only reports the first failure. parallel spreads compare, checksteps")
+                print("    and table across every core. gray walks the rows so one input")
+                print("    changes at a time and only reevaluates what depends on it. auto")
+                print("    tries random inputs first and only checks every row if they agree")
+                print(" - sat")
+                print("   ~prompts for a boolean statement and finds inputs that make it")
+                print("    true if there are any")
+                print(" - count")
+                print("   ~prompts for a boolean statement and counts the inputs that make")
+                print("    it true without generating the truth table, any number of them")
+                print("    can then be listed")
+                print(" - stats")
+                print("   ~shows the time spent parsing, compiling and evaluating along")
+                print("    with the nodes evaluated and cache hits. Instrumentation can be")
+                print("    turned on, off, on with sampling of the slowest subtrees or reset")
+                print("Operators, tightest first:")
+                print(" - A' not")
+                print(" - AB or A*B and, A~*B nand")
+                print(" - A^B xor, A~^B xnor")
+                print(" - A+B or, A~+B nor")
+        
+            elif func == "table":
+                statement = input("Boolean Statement: ")
+                output = input("Output path (blank to print): ").strip()
+                if ";" in statement:
+                    # Several statements separated by ; share one table
+                    statements = [part.strip() for part in statement.split(";") if part.strip() != ""]
+                    if len(statements) == 0:
+                        print("No statements!")
+                        continue
+                    for i,part in enumerate(statements):
+                        print("X{} = {}".format(i + 1, part))
+                    groups = truthTables(statements, output or None)
+                    for group in groups:
+                        if len(group) > 1:
+                            print("Equivalent:", " = ".join(group))
+                else:
+                    truthTable(statement, os.cpu_count() if strategy == "parallel" else 1, output or None,
+                               strategy=strategy)
+                if output:
+                    print("Table written to", output)
+        
+            elif func == "checksteps":
+                # Check steps will let the user enter all of their steps.
+        
+                print("Type break when you're finished entering steps")
+        
+                initExpr = input("Initial Expression: ")
+            
+                # Initial expression is only parsed and evaluated once
+                checker = StepChecker(initExpr, strategy)
+        
+                step = 1
+                prevExpr = initExpr
+        
+                moreSteps = True
+                while moreSteps:
+                    expr = input("Step {0}: ".format(step))
+            
+                    if expr.lower() == "break":
+                        moreSteps = False
+                        print("All steps are were correct!")
+                    else:
+                        matchesInitial, matchesPrevious = checker.check(expr)
+                
+                        if matchesInitial == False:
+                            print("Invalid Step {0}!".format(step))
+                            print(prevExpr,"!=",expr)
+                            if checker.failure != None:
+                                print("Differs with parameters:")
+                                print(" ".join([char+"="+str(val) for char,val in checker.failure.items()]))
+                            moreSteps = False
+                        step+= 1
+                    prevExpr = expr
+            elif func == "sat":
+                statement = input("Boolean Statement: ")
+                assignment = satisfy(statement)
+                if assignment == None:
+                    print("Unsatisfiable")
+                else:
+                    print(" ".join([char+"="+str(val) for char,val in assignment.items()]))
+        
+            elif func == "simplify":
+                statement = input("Boolean Statement: ")
+                print(simplify(statement))
+        
+            elif func == "count":
+                statement = input("Boolean Statement: ")
+                count = countModels(statement)
+                inputChars = statementInputs(statement)
+                print("{} of {} assignments make it true".format(count, 1 << len(inputChars)))
+                
+                shown = input("Assignments to list (blank for none): ").strip()
+                if shown.isdigit():
+                    for assignment in itertools.islice(models(statement), int(shown)):
+                        print(" ".join([char+"="+str(val) for char,val in assignment.items()]))
+        
+            elif func == "stats":
+                choice = input("Instrumentation (on, sample, off, reset or blank to show): ").strip()
+                if choice == "on":
+                    Stats.enable()
+                elif choice == "sample":
+                    Stats.enable(sampling=True)
+                elif choice == "off":
+                    Stats.disable()
+                elif choice == "reset":
+                    Stats.reset()
+                elif choice == "":
+                    print("\n".join(Stats.report()))
+                else:
+                    print("Unknown option!")
+        
+            elif func == "strategy":
+                choice = input("Strategy ({}): ".format(strategy)).strip()
+                if choice in ["bits", "rows", "aig", "bdd", "sat", "parallel", "gray", "auto"]:
+                    strategy = choice
+                elif choice != "":
+                    print("Unknown strategy!")
+        
+            else:
+                print("Invalid Commmand!")
+                print("Type help")
+            
+        except ExpressionError as error:
+            # Point at where the expression went wrong
+            print("Syntax error:", error)
+            print(" ", error.statement)
+            print(" ", " " * error.position + "^")
+
+def runJob(job:dict):
+    
+    '''
+    Runs one job, a dictionary naming an op and its statements, and returns the
+    result as a dictionary. Ops mirror the REPL commands:
+     - eval: statement and inputs, gives result
+     - compare: statement1 and statement2, gives equivalent and a counterexample
+     - table: statement, gives inputs and the output column as a string of 0/1,
+       or statements, giving an output column for each and the groups of indices
+       of equivalent statements
+     - checksteps: steps (the initial expression first), gives valid, the first
+       invalid step and a counterexample
+     - simplify: statement, gives result
+     - sat: statement, gives satisfiable and an assignment
+     - count: statement, gives inputs and the number of assignments making it true,
+       with a limit also the first limit of those assignments as models
+    compare and checksteps take an optional strategy. Any id in the job is copied
+    into the result.
+    '''
+    
+    op = job.get("op")
+    strategy = job.get("strategy", "bits")
+    result = {"op":op} if "id" not in job else {"id":job["id"], "op":op}
+    
+    if op == "eval":
+        statement = job["statement"]
+        inputChars = statementInputs(statement)
+        function = compileTree(cachedTree(statement), inputChars)
+        result["result"] = function(*[int(job["inputs"][char]) for char in inputChars])
+    
+    elif op == "compare":
+        failure = next(iterFailures(job["statement1"], job["statement2"], strategy), None)
+        result["equivalent"] = failure == None
+        result["counterexample"] = failure
+    
+    elif op == "table" and "statements" in job:
+        if len(job["statements"]) == 0:
+            raise ValueError("Expected at least one statement")
+        inputChars = sorted(set().union(*[statementInputs(statement) for statement in job["statements"]]))
+        outputs = [""] * len(job["statements"])
+        groups = [list(range(len(job["statements"])))]
+        for first, tables, chunkVars in forestChunks(job["statements"], inputChars):
+            for i,table in enumerate(tables):
+                outputs[i] += format(table, "0{}b".format(1 << chunkVars))[::-1]
+            groups = refineGroups(groups, tables)
+        result["inputs"] = inputChars
+        result["outputs"] = outputs
+        result["groups"] = groups
+    
+    elif op == "table":
+        inputChars = statementInputs(job["statement"])
+        if Store != None:
+            table = int.from_bytes(Store.table(job["statement"], inputChars), "little")
+        else:
+            table = cachedTable(job["statement"], inputChars)
+        result["inputs"] = inputChars
+        result["outputs"] = format(table, "0{}b".format(1 << len(inputChars)))[::-1]
+    
+    elif op == "checksteps":
+        checker = StepChecker(job["steps"][0], strategy)
+        result["valid"] = True
+        result["invalidStep"] = None
+        result["counterexample"] = None
+        for step,expr in enumerate(job["steps"][1:], 1):
+            if checker.check(expr)[0] == False:
+                result["valid"] = False
+                result["invalidStep"] = step
+                result["counterexample"] = checker.failure
+                break
+    
+    elif op == "simplify":
+        result["result"] = simplify(job["statement"])
+    
+    elif op == "count":
+        result["inputs"] = statementInputs(job["statement"])
+        result["count"] = countModels(job["statement"])
+        if "limit" in job:
+            result["models"] = list(itertools.islice(models(job["statement"]), job["limit"]))
+    
+    elif op == "sat":
+        assignment = satisfy(job["statement"])
+        result["satisfiable"] = assignment != None
+        result["assignment"] = assignment
+    
+    else:
+        raise ValueError("Unknown op: {}".format(op))
+    
+    return result
+
+def parseJob(line:str):
+    
+    '''
+    A line of batch input as a job. JSON objects are taken as they are, otherwise
+    two expressions separated by = are compared and a single expression gives its
+    truth table, as do several expressions separated by ; with a column each.
+    '''
+    
+    if line.startswith("{"):
+        return json.loads(line)
+    if ";" in line:
+        return {"op":"table", "statements":[part.strip() for part in line.split(";") if part.strip() != ""]}
+    if "=" in line:
+        statement1, statement2 = line.split("=", 1)
+        return {"op":"compare", "statement1":statement1.strip(), "statement2":statement2.strip()}
+    return {"op":"table", "statement":line}
+
+def lineResult(line:str):
+    # The result of the job on a line of input, errors are given as the result
+    # so a bad job (even one with fields of the wrong type) only fails its line
+    try:
+        return runJob(parseJob(line))
+    except ExpressionError as error:
+        return {"error":str(error), "position":error.position}
+    except Exception as error:
+        return {"error":"{}: {}".format(type(error).__name__, error)}
+
+def runBatch(source, output):
+    
+    '''
+    Runs a job for every non-blank line of source and writes each result to
+    output as a line of JSON, along with the line number it came from. Jobs are
+    streamed so results are written as they finish. A job that fails gives an
+    error (and the position for syntax errors) rather than stopping the batch.
+    Returns the number of jobs that failed.
+    '''
+    
+    failed = 0
+    for number,line in enumerate(source, 1):
+        line = line.strip()
+        if line == "":
+            continue
+        
+        result = lineResult(line)
+        if "error" in result:
+            failed += 1
+        output.write(json.dumps({"line":number, **result}) + "\n")
+    
+    output.flush()
+    return failed
+
+async def serveConnection(reader, writer, pool, slots, timeout:float, maxPending:int, lineLimit:int):
+    
+    '''
+    Serves one client. Lines are read and their jobs started as soon as they
+    arrive, so a client can pipeline any number of jobs, and results are written
+    back in the order the lines came in. At most maxPending jobs of a connection
+    are held, once that many are waiting reading stops until the oldest has been
+    written so a fast client is slowed down to the speed of the pool. Lines longer
+    than lineLimit (the reader's limit) or that aren't UTF-8 get an error line.
+    '''
+    
+    loop = asyncio.get_running_loop()
+    pending = asyncio.Queue(maxPending)
+    
+    async def readLine():
+        # The next line, b"" at the end of input or None for a line over the
+        # limit, which is skipped a piece at a time up to its newline
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as error:
+            return error.partial
+        except asyncio.LimitOverrunError as error:
+            try:
+                while True:
+                    await reader.readexactly(error.consumed)
+                    try:
+                        await reader.readuntil(b"\n")
+                        return None
+                    except asyncio.LimitOverrunError as more:
+                        error = more
+            except asyncio.IncompleteReadError:
+                return None
+    
+    async def failLine(message:str):
+        return {"error":message}
+    
+    def lineJob(line:bytes):
+        # What answers a line read by readLine, None for a blank line
+        if line == None:
+            return failLine("Line is longer than {} bytes".format(lineLimit))
+        try:
+            line = line.decode().strip()
+        except UnicodeDecodeError as error:
+            return failLine("UnicodeDecodeError: {}".format(error))
+        return runLine(line) if line != "" else None
+    
+    async def runLine(line:str):
+        # Waits for an idle worker and runs the job there, so the timeout only
+        # counts time spent running. The slot is held until the worker is done,
+        # even if the job timed out and its result is thrown away
+        await slots.acquire()
+        future = loop.run_in_executor(pool, lineResult, line)
+        future.add_done_callback(lambda future: slots.release())
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            # Nothing waits on it anymore, its exception is consumed when it ends
+            future.add_done_callback(lambda future: future.cancelled() or future.exception())
+            return {"error":"Timed out after {} seconds".format(timeout)}
+        except Exception as error:
+            # A job that breaks the worker only fails its own line
+            return {"error":"{}: {}".format(type(error).__name__, error)}
+    
+    async def respond():
+        # Writes results in order, drain waits while the client isn't reading
+        while True:
+            number, task = await pending.get()
+            if task == None:
+                break
+            writer.write((json.dumps({"line":number, **await task}) + "\n").encode())
+            await writer.drain()
+    
+    responder = asyncio.create_task(respond())
+    try:
+        number = 0
+        while True:
+            line = await readLine()
+            if line == b"":
+                break
+            number += 1
+            job = lineJob(line)
+            if job != None:
+                await pending.put((number, asyncio.create_task(job)))
+        
+        await pending.put((number, None))
+        await responder
+    except (ConnectionError, asyncio.IncompleteReadError):
+        # Client went away, the jobs it left behind are dropped
+        responder.cancel()
+    finally:
+        writer.close()
+
+def jobPool(workers=None):
+    # Process pool for jobs, workers share the table store if there is one
+    return concurrent.futures.ProcessPoolExecutor(workers, initializer=useStore,
+        initargs=(None,) if Store == None else (Store.directory, Store.maxBytes))
+
+async def startServer(host="127.0.0.1", port=8765, path:str=None, workers=None, timeout=30.0,
+                      maxPending=64, pool=None, lineLimit=None):
+    
+    '''
+    Starts a server for newline-delimited JSON jobs, each line is handled as a
+    line of batch input and gets back its result from runJob. The server listens
+    on the Unix socket at path if there is one, otherwise on host and port. Jobs
+    run on pool (a pool of workers processes by default), with at most workers
+    jobs in flight across every connection so a job starts as soon as it's handed
+    to the pool. A job running longer than timeout seconds gets an error instead
+    of its result, the worker running it carries on until it's done. Lines longer
+    than lineLimit bytes (ServerLineBytes by default) get an error. Returns the
+    asyncio server.
+    '''
+    
+    if workers == None:
+        workers = os.cpu_count() or 1
+    if lineLimit == None:
+        lineLimit = ServerLineBytes
+    if pool == None:
+        pool = jobPool(workers)
+    slots = asyncio.Semaphore(workers)
+    
+    def handle(reader, writer):
+        return serveConnection(reader, writer, pool, slots, timeout, maxPending, lineLimit)
+    
+    if path != None:
+        return await asyncio.start_unix_server(handle, path, limit=lineLimit)
+    return await asyncio.start_server(handle, host, port, limit=lineLimit)
+
+def serve(host="127.0.0.1", port=8765, path:str=None, workers=None, timeout=30.0, maxPending=64):
+    # Runs a server until it's interrupted
+    
+    async def run():
+        with jobPool(workers) as pool:
+            server = await startServer(host, port, path, workers, timeout, maxPending, pool)
+            print("Serving on", path if path != None else "{}:{}".format(host, port), file=sys.stderr)
+            async with server:
+                await server.serve_forever()
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+def request(jobs:list, host="127.0.0.1", port=8765, path:str=None, timeout=None):
+    
+    '''
+    Simple blocking client, sends every job (dictionaries or lines of batch input)
+    down one connection at once and returns their results in order.
+    '''
+    
+    if path != None:
+        connection = socket.socket(socket.AF_UNIX)
+        connection.settimeout(timeout)
+        connection.connect(path)
     else:
-        print("Invalid Commmand!")
-        print("Type help")
\ No newline at end of file
+        connection = socket.create_connection((host, port), timeout)
+    
+    with connection:
+        lines = [job if type(job) == str else json.dumps(job) for job in jobs]
+        connection.sendall("".join([line + "\n" for line in lines]).encode())
+        connection.shutdown(socket.SHUT_WR)
+        
+        with connection.makefile("r") as stream:
+            return [json.loads(stream.readline()) for line in lines if line.strip() != ""]
+
+def main(args:list=None):
+    parser = argparse.ArgumentParser(description="Boolean Algebra Engine")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="run the jobs in FILE (or stdin) and write JSON lines results")
+    parser.add_argument("--output", default="-", metavar="FILE",
+                        help="where batch results are written, stdout by default")
+    parser.add_argument("--store", metavar="DIR",
+                        help="keep truth tables in DIR and reuse them across runs")
+    parser.add_argument("--store-size", type=int, default=1024, metavar="MB",
+                        help="size the table store is kept under, 1024 MB by default")
+    parser.add_argument("--serve", nargs="?", const="127.0.0.1:8765", metavar="ADDRESS",
+                        help="serve JSON lines jobs on HOST:PORT or a Unix socket path")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="processes serving jobs, one per core by default")
+    parser.add_argument("--timeout", type=float, default=30.0, metavar="SECONDS",
+                        help="longest a served job may take, 30 seconds by default")
+    options = parser.parse_args(args)
+    
+    if options.store != None:
+        useStore(options.store, options.store_size << 20)
+    
+    if options.serve != None:
+        host, separator, port = options.serve.rpartition(":")
+        if separator and port.isdigit():
+            serve(host or "127.0.0.1", int(port), workers=options.workers, timeout=options.timeout)
+        else:
+            serve(path=options.serve, workers=options.workers, timeout=options.timeout)
+        return 0
+    
+    if options.batch == None:
+        repl()
+        return 0
+    
+    source = sys.stdin if options.batch == "-" else open(options.batch)
+    output = sys.stdout if options.output == "-" else open(options.output, "w", buffering=1 << 20)
+    try:
+        return 1 if runBatch(source, output) else 0
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
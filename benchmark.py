@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import BooleanAlgebra
+
+# Scales benchmarked by default and with --quick
+InputCounts = [4, 8, 12, 16, 20, 24]
+OperatorCounts = [10, 100, 1000, 10000]
+QuickInputCounts = [4, 8, 12]
+QuickOperatorCounts = [10, 100]
+
+# Whole truth tables are only timed up to this many inputs
+TableLimit = 20
+
+def randomExpression(rng:random.Random, inputChars:list, operators:int):
+
+    '''
+    Random expression over inputChars with the given number of binary operators.
+    Terms are merged pairwise at random positions so the expression has a mix of
+    flat chains and nesting, with nots and implicit ands throughout.
+    '''
+
+    terms = [rng.choice(inputChars) + ("'" if rng.random() < 0.3 else "") for i in range(operators + 1)]
+
+    for i in range(operators):
+        index = rng.randrange(len(terms) - 1)
+        left, right = terms[index], terms[index + 1]
+
+        if rng.random() < 0.5:
+            term = left + "+" + right
+        else:
+            term = left + right if rng.random() < 0.5 else left + "*" + right
+
+        # Brackets keep the structure, some of them are negated
+        if rng.random() < 0.5:
+            term = "(" + term + ")" + ("'" if rng.random() < 0.2 else "")
+
+        terms[index:index + 2] = [term]
+
+    return terms[0]
+
+def differentExpression(rng:random.Random, statement:str, inputChars:list):
+
+    '''
+    An expression that isn't equivalent to statement, the statement or'd with a
+    single row where it's false (its negation if it's never false). Only the inputs
+    the statement uses appear in the row since compare takes its inputs from the
+    first statement.
+    '''
+
+    inputChars = [char for char in inputChars if char in statement]
+    function = BooleanAlgebra.compileTree(BooleanAlgebra.constructTree(statement), inputChars)
+    for i in range(1000):
+        row = [rng.randint(0, 1) for char in inputChars]
+        if function(*row) == 0:
+            term = "".join([char + ("" if val else "'") for char,val in zip(inputChars, row)])
+            return statement + "+" + term
+    return "(" + statement + ")'"
+
+def measure(function, repeat:int):
+    # Best time of repeat runs, the cache is cleared before each run
+    best = None
+    for i in range(repeat):
+        BooleanAlgebra.Cache.clear()
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best == None else min(best, elapsed)
+    return best
+
+def runBenchmarks(inputCounts:list, operatorCounts:list, seed=0, log=print):
+
+    '''
+    Times convert, constructTree, a single eval, a full truth table and compare
+    for equivalent and non-equivalent pairs at every scale. Expressions come from
+    a generator seeded per scale so every run times the same expressions. Returns
+    the times in seconds keyed by benchmark name.
+    '''
+
+    results = {}
+
+    for count in inputCounts:
+        inputChars = [chr(ord("A") + i) for i in range(count)]
+
+        for operators in operatorCounts:
+            rng = random.Random("{}/{}/{}".format(seed, count, operators))
+            statement = randomExpression(rng, inputChars, operators)
+            equivalent = "(" + statement + ")''"
+            different = differentExpression(rng, statement, inputChars)
+
+            # Large scales are slow enough that one run is stable
+            repeat = 5 if operators * (1 << min(count, 16)) < 1 << 20 else 1
+            scale = "inputs={}/operators={}".format(count, operators)
+
+            tree = BooleanAlgebra.constructTree(statement)
+            rows = [dict(zip(inputChars, [rng.randint(0, 1) for char in inputChars])) for i in range(100)]
+
+            timings = {
+                "convert": lambda: BooleanAlgebra.convert(statement),
+                "constructTree": lambda: BooleanAlgebra.constructTree(statement),
+                "eval": lambda: [tree.eval(row) for row in rows],
+                "compare/equivalent": lambda: BooleanAlgebra.compare(statement, equivalent, False),
+                "compare/different": lambda: BooleanAlgebra.compare(statement, different, False),
+            }
+            if count <= TableLimit:
+                timings["truthTable"] = lambda: BooleanAlgebra.truthTable(statement, output=os.devnull)
+
+            for name, function in timings.items():
+                elapsed = measure(function, repeat)
+                if name == "eval":
+                    # Reported per evaluation
+                    elapsed /= len(rows)
+                results[name + "/" + scale] = elapsed
+                log("{0:<55} {1:>12.6f}s".format(name + "/" + scale, elapsed))
+
+    return results
+
+def compareResults(results:dict, baseline:dict, threshold:float, log=print):
+
+    '''
+    Flags benchmarks that got slower than the baseline by more than threshold
+    (0.25 is 25% slower). Differences under a millisecond are treated as noise.
+    Returns the names of the regressed benchmarks.
+    '''
+
+    regressions = []
+    for name in sorted(set(results) & set(baseline)):
+        ratio = results[name] / max(baseline[name], 1e-9)
+        regressed = ratio > 1 + threshold and results[name] - baseline[name] > 1e-3
+        if regressed:
+            regressions.append(name)
+        log("{0:<55} {1:>8.2f}x{2}".format(name, ratio, "  REGRESSION" if regressed else ""))
+
+    return regressions
+
+def main(args:list=None):
+    parser = argparse.ArgumentParser(description="Boolean Algebra Engine benchmarks")
+    parser.add_argument("--output", default="benchmark.json", metavar="FILE",
+                        help="where results are written as JSON")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="results to compare against, regressions give a non-zero exit")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown over the baseline flagged as a regression")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quick", action="store_true", help="only run the small scales")
+    options = parser.parse_args(args)
+
+    if options.quick:
+        results = runBenchmarks(QuickInputCounts, QuickOperatorCounts, options.seed)
+    else:
+        results = runBenchmarks(InputCounts, OperatorCounts, options.seed)
+
+    with open(options.output, "w") as file:
+        json.dump({
+            "meta": {"python":platform.python_version(), "platform":platform.platform(),
+                     "seed":options.seed, "time":time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results,
+        }, file, indent=1)
+
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)["results"]
+        print()
+        if compareResults(results, baseline, options.threshold):
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
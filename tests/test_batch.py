@@ -0,0 +1,33 @@
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import BooleanAlgebra
+
+class BatchTest(unittest.TestCase):
+
+    def batch(self, lines:list):
+        output = io.StringIO()
+        failed = BooleanAlgebra.runBatch(lines, output)
+        return failed, [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def testBadJobsOnlyFailTheirLine(self):
+        failed, results = self.batch([
+            json.dumps({"op":"compare", "statement1":["A"], "statement2":"A"}),
+            json.dumps({"op":"table", "statements":[]}),
+            "A+(",
+            "",
+            "A=A",
+        ])
+        self.assertEqual(failed, 3)
+        self.assertEqual([result["line"] for result in results], [1, 2, 3, 5])
+        for result in results[:3]:
+            self.assertIn("error", result)
+        self.assertEqual(results[2]["position"], 3)
+        self.assertTrue(results[3]["equivalent"])
+
+if __name__ == "__main__":
+    unittest.main()
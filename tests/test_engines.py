@@ -0,0 +1,376 @@
+import itertools
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import BooleanAlgebra
+
+def randomStatement(rng:random.Random, inputChars:list, operators:int):
+    # Random statement with nots, brackets and every binary operator
+    terms = [rng.choice(inputChars + ["0", "1"]) + rng.choice(["", "", "'"]) for i in range(operators + 1)]
+    while len(terms) > 1:
+        index = rng.randrange(len(terms) - 1)
+        term = terms[index] + rng.choice(["+", "*", "", "^", "~*", "~+", "~^"]) + terms[index + 1]
+        terms[index:index + 2] = ["(" + term + ")" + rng.choice(["", "'"])]
+    return terms[0]
+
+def bruteForce(statement:str, inputChars:list):
+    # Value of a statement on every row, first input first, through Node.eval
+    tree = BooleanAlgebra.constructTree(statement)
+    return [tree.eval(dict(zip(inputChars, BooleanAlgebra.rowValues(row, len(inputChars)))))
+            for row in range(1 << len(inputChars))]
+
+# Binding strength of the operators, a ~ before an operator negates it
+Precedence = {"+":1, "~+":1, "^":2, "~^":2, "*":3, "~*":3}
+
+def referenceEval(statement:str, values:dict):
+    # Independent precedence climbing evaluator, implicit ands are made explicit first
+    tokens = []
+    i = 0
+    while i < len(statement):
+        token = statement[i:i + 2] if statement[i] == "~" else statement[i]
+        if tokens and (token.isalnum() or token == "(") and (tokens[-1].isalnum() or tokens[-1] in ")'"):
+            tokens.append("*")
+        tokens.append(token)
+        i += len(token)
+    position = [0]
+
+    def operand():
+        token = tokens[position[0]]
+        position[0] += 1
+        if token == "(":
+            val = expression(0)
+            position[0] += 1
+        else:
+            val = int(token) if token.isdigit() else values[token]
+        while position[0] < len(tokens) and tokens[position[0]] == "'":
+            val = 1 - val
+            position[0] += 1
+        return val
+
+    def expression(least:int):
+        val = operand()
+        while position[0] < len(tokens) and Precedence.get(tokens[position[0]], 0) >= max(least, 1):
+            operator = tokens[position[0]]
+            position[0] += 1
+            right = expression(Precedence[operator] + 1)
+            val = {"+":val | right, "*":val & right, "^":val ^ right}[operator[-1]]
+            if operator[0] == "~":
+                val = 1 - val
+        return val
+
+    return expression(0)
+
+def flatStatement(rng:random.Random, inputChars:list, depth=0):
+    # Random statement leaning on precedence rather than brackets
+    terms = []
+    for i in range(rng.randint(1, 5)):
+        if depth < 2 and rng.random() < 0.2:
+            term = "(" + flatStatement(rng, inputChars, depth + 1) + ")"
+        else:
+            term = rng.choice(inputChars + ["0", "1"])
+        terms.append(term + "'" * rng.choice([0, 0, 1, 2]))
+    statement = terms[0]
+    for term in terms[1:]:
+        statement += rng.choice(["+", "*", "", "^", "~*", "~+", "~^"]) + term
+    return statement
+
+class ParserTest(unittest.TestCase):
+
+    def testErrorPositions(self):
+        # Statement to the position of its error and part of the message
+        cases = {
+            "A+(":(3, "Unexpected end"), "A+)":(2, "before ')'"), "(A":(0, "Unmatched '('"),
+            "A+":(2, "Unexpected end"), "+A":(0, "before '+'"), "'A":(0, "before \"'\""),
+            "A*~+B":(2, "before '~'"), "A~B":(2, "after '~'"), "A&B":(1, "Unexpected character"),
+            "AB)":(2, "Unmatched ')'"), "((A)":(0, "Unmatched '('"), "A++B":(2, "before '+'"),
+            "A()":(2, "before ')'"), "":(0, "Unexpected end"), "a":(0, "Unexpected character"),
+        }
+        for statement,(position,message) in cases.items():
+            with self.assertRaises(BooleanAlgebra.ExpressionError, msg=statement) as context:
+                BooleanAlgebra.constructTree(statement)
+            self.assertEqual(context.exception.position, position, statement)
+            self.assertEqual(context.exception.statement, statement)
+            self.assertIn(message, str(context.exception), statement)
+
+    def testAgainstReference(self):
+        rng = random.Random(2)
+        inputChars = list("ABCD")
+        for i in range(300):
+            statement = flatStatement(rng, inputChars)
+            tree = BooleanAlgebra.constructTree(statement)
+            for row in range(1 << len(inputChars)):
+                values = dict(zip(inputChars, BooleanAlgebra.rowValues(row, len(inputChars))))
+                self.assertEqual(tree.eval(values), referenceEval(statement, values), statement)
+
+    def testLongStatements(self):
+        # Thousands of terms parse without recursion
+        statement = "+".join(["AB'C"] * 5000) + "+" + "(" * 3000 + "D" + ")" * 3000
+        tree = BooleanAlgebra.constructTree(statement)
+        self.assertEqual(tree.eval({"A":1, "B":0, "C":1, "D":0}), 1)
+        self.assertEqual(tree.eval({"A":1, "B":1, "C":1, "D":0}), 0)
+
+class EvalTest(unittest.TestCase):
+
+    def testAgainstCompiled(self):
+        rng = random.Random(1)
+        inputChars = list("ABCDE")
+        for i in range(200):
+            statement = randomStatement(rng, inputChars, rng.randint(1, 30))
+            tree = BooleanAlgebra.constructTree(statement)
+            function = BooleanAlgebra.compileTree(tree, inputChars)
+            for row in range(1 << len(inputChars)):
+                values = BooleanAlgebra.rowValues(row, len(inputChars))
+                self.assertEqual(tree.eval(dict(zip(inputChars, values))), function(*values), statement)
+
+    def testDeepTrees(self):
+        # Far deeper than the recursion limit, evaluated past EvalDepth by the stack walk
+        tree = BooleanAlgebra.constructTree("A" + "'" * 20001)
+        self.assertEqual(tree.eval({"A":1}), 0)
+        tree = BooleanAlgebra.constructTree("(" * 5000 + "A" + ")'B" * 5000)
+        self.assertEqual(tree.eval({"A":0, "B":1}), 0)
+        self.assertEqual(tree.eval({"A":1, "B":1}), 1)
+
+def bddValue(diagram, node:int, values:dict):
+    # Follows a diagram from node to a constant for one assignment
+    while node > 1:
+        node = diagram.hi[node] if values[diagram.var[node]] else diagram.lo[node]
+    return node
+
+class BDDTest(unittest.TestCase):
+
+    def testCompareAgainstRows(self):
+        rng = random.Random(3)
+        inputChars = list("ABCDE")
+        for i in range(200):
+            statement1 = randomStatement(rng, inputChars, rng.randint(1, 15))
+            statement2 = statement1 + "''" if rng.random() < 0.3 else randomStatement(rng, inputChars, rng.randint(1, 15))
+            tree1, tree2 = BooleanAlgebra.constructTree(statement1), BooleanAlgebra.constructTree(statement2)
+            rows = list(BooleanAlgebra.compareRows(tree1, tree2, inputChars))
+            fails, failures = BooleanAlgebra.compareBDD(tree1, tree2, inputChars)
+            self.assertEqual(fails, len(rows), (statement1, statement2))
+            self.assertCountEqual([tuple(failure.values()) for failure in failures],
+                                  [tuple(row.values()) for row in rows])
+
+    def testCountModels(self):
+        rng = random.Random(4)
+        inputChars = list("ABCDE")
+        for i in range(100):
+            statement = randomStatement(rng, inputChars, rng.randint(1, 15))
+            support = BooleanAlgebra.statementInputs(statement)
+            self.assertEqual(BooleanAlgebra.countModels(statement), sum(bruteForce(statement, support)), statement)
+            self.assertEqual(BooleanAlgebra.countModels(statement, inputChars),
+                             sum(bruteForce(statement, inputChars)), statement)
+            models = list(BooleanAlgebra.models(statement, inputChars))
+            self.assertEqual(len(models), sum(bruteForce(statement, inputChars)))
+            tree = BooleanAlgebra.constructTree(statement)
+            for model in models:
+                self.assertEqual(tree.eval(model), 1, statement)
+
+    def testSwapAndSiftKeepFunctions(self):
+        rng = random.Random(5)
+        inputChars = list("ABCDEF")
+        for i in range(40):
+            trees = [BooleanAlgebra.constructTree(randomStatement(rng, inputChars, rng.randint(1, 20)))
+                     for j in range(2)]
+            diagram = BooleanAlgebra.BDD(inputChars)
+            roots = [diagram.addTree(tree) for tree in trees]
+            diagram.swap(rng.randrange(len(inputChars) - 1), roots)
+            diagram.sift(roots)
+            self.assertCountEqual(diagram.order, inputChars)
+            for row in range(1 << len(inputChars)):
+                values = dict(zip(inputChars, BooleanAlgebra.rowValues(row, len(inputChars))))
+                for tree,root in zip(trees, roots):
+                    self.assertEqual(bddValue(diagram, root, values), tree.eval(values))
+
+    def testSiftShrinksBadOrder(self):
+        # Pairs of inputs ordered as far apart as possible need a node per
+        # combination of the first half, sifting brings each pair together
+        first, second = list("ABCDEF"), list("GHIJKL")
+        tree = BooleanAlgebra.constructTree("+".join([a + b for a,b in zip(first, second)]))
+        diagram = BooleanAlgebra.BDD(first + second)
+        root = diagram.addTree(tree)
+        before = len(diagram.reachable([root]))
+        after = diagram.sift([root])
+        self.assertGreater(before, 100)
+        self.assertEqual(after, len(diagram.reachable([root])))
+        self.assertLessEqual(after, 2 * len(first) + 2)
+        self.assertEqual(diagram.satCount(root), sum(bruteForce(BooleanAlgebra.treeText(tree), first + second)))
+
+    def testSiftWhileBuilding(self):
+        # A limit this small sifts several times while the trees are built
+        rng = random.Random(6)
+        inputChars = list("ABCDEFG")
+        for i in range(30):
+            statement1 = randomStatement(rng, inputChars, rng.randint(10, 30))
+            statement2 = "(" + statement1 + ")''" if i % 2 else randomStatement(rng, inputChars, 20)
+            tree1, tree2 = BooleanAlgebra.constructTree(statement1), BooleanAlgebra.constructTree(statement2)
+            diagram = BooleanAlgebra.BDD(inputChars, 16)
+            root1 = diagram.addTree(tree1)
+            root2 = diagram.addTree(tree2, [root1])
+            self.assertEqual(root1 == root2, not list(BooleanAlgebra.compareRows(tree1, tree2, inputChars)))
+            for row in range(1 << len(inputChars)):
+                values = dict(zip(inputChars, BooleanAlgebra.rowValues(row, len(inputChars))))
+                self.assertEqual(bddValue(diagram, root1, values), tree1.eval(values))
+                self.assertEqual(bddValue(diagram, root2, values), tree2.eval(values))
+
+def cnfSatisfiable(clauses:list, count:int):
+    # Brute force satisfiability of clauses over variables 1 to count
+    for row in range(1 << count):
+        if all([any([(row >> (abs(lit) - 1) & 1) == (lit > 0) for lit in clause]) for clause in clauses]):
+            return True
+    return False
+
+class SATSolverTest(unittest.TestCase):
+
+    def testRandomCNF(self):
+        # Three literal clauses near the threshold give both answers often
+        rng = random.Random(7)
+        for i in range(300):
+            count = rng.randint(3, 10)
+            clauses = [[rng.choice([-1, 1]) * rng.randint(1, count) for k in range(3)]
+                       for j in range(int(count * 4.3))]
+            solver = BooleanAlgebra.SATSolver()
+            for j in range(count):
+                solver.newVar()
+            for clause in clauses:
+                solver.addClause(clause)
+            satisfiable = solver.solve()
+            self.assertEqual(satisfiable, cnfSatisfiable(clauses, count), clauses)
+            if satisfiable:
+                for clause in clauses:
+                    self.assertTrue(any([solver.model[abs(lit)] == (lit > 0) for lit in clause]), clause)
+
+    def testPigeonhole(self):
+        # Five pigeons never fit in four holes
+        solver = BooleanAlgebra.SATSolver()
+        holes = [[solver.newVar() for hole in range(4)] for pigeon in range(5)]
+        for pigeon in holes:
+            solver.addClause(pigeon)
+        for hole in range(4):
+            for a in range(5):
+                for b in range(a + 1, 5):
+                    solver.addClause([-holes[a][hole], -holes[b][hole]])
+        self.assertFalse(solver.solve())
+
+    def testIncrementalEnumeration(self):
+        # Blocking each model in turn finds every model of a statement once
+        rng = random.Random(8)
+        inputChars = list("ABCDE")
+        for i in range(60):
+            statement = randomStatement(rng, inputChars, rng.randint(1, 15))
+            solver = BooleanAlgebra.SATSolver()
+            inputVars = {char:solver.newVar() for char in inputChars}
+            solver.addClause([BooleanAlgebra.tseitin(BooleanAlgebra.constructTree(statement), solver, inputVars)])
+            found = 0
+            while solver.solve():
+                found += 1
+                solver.addClause([-inputVars[char] if solver.model[inputVars[char]] else inputVars[char]
+                                  for char in inputChars])
+            self.assertEqual(found, sum(bruteForce(statement, inputChars)), statement)
+
+    def testSatisfyAndCompare(self):
+        rng = random.Random(9)
+        inputChars = list("ABCDE")
+        for i in range(150):
+            statement1 = randomStatement(rng, inputChars, rng.randint(1, 15))
+            statement2 = statement1 + "''" if rng.random() < 0.3 else randomStatement(rng, inputChars, rng.randint(1, 15))
+            assignment = BooleanAlgebra.satisfy(statement1)
+            if assignment == None:
+                self.assertEqual(sum(bruteForce(statement1, inputChars)), 0, statement1)
+            else:
+                self.assertEqual(BooleanAlgebra.constructTree(statement1).eval(assignment), 1, statement1)
+            if set(BooleanAlgebra.statementInputs(statement2)) <= set(BooleanAlgebra.statementInputs(statement1)):
+                self.assertEqual(BooleanAlgebra.compare(statement1, statement2, False, "sat"),
+                                 BooleanAlgebra.compare(statement1, statement2, False, "rows"), (statement1, statement2))
+
+def bruteForcePrimes(minterms:list, count:int):
+    # Every cube that only covers minterms and can't lose an input and still do so
+    onset = set(minterms)
+    implicant = lambda value, care: all([row in onset for row in range(1 << count) if row & care == value])
+    primes = set()
+    for care in range(1 << count):
+        for value in range(1 << count):
+            if value & ~care or not implicant(value, care):
+                continue
+            bits = [1 << i for i in range(count) if care >> i & 1]
+            if not any([implicant(value & ~bit, care & ~bit) for bit in bits]):
+                primes.add((value, care))
+    return primes
+
+class MinimizeTest(unittest.TestCase):
+
+    def testPrimeImplicants(self):
+        rng = random.Random(10)
+        for i in range(100):
+            count = rng.randint(1, 5)
+            minterms = [row for row in range(1 << count) if rng.random() < 0.5]
+            self.assertEqual(set(BooleanAlgebra.primeImplicants(minterms, count)),
+                             bruteForcePrimes(minterms, count), minterms)
+
+    def testPetrickIsMinimal(self):
+        # The cover uses as few primes as any cover does, found by trying every size
+        rng = random.Random(11)
+        for i in range(60):
+            count = rng.randint(2, 4)
+            minterms = [row for row in range(1 << count) if rng.random() < 0.5]
+            primes = BooleanAlgebra.primeImplicants(minterms, count)
+            chosen = BooleanAlgebra.petrick(primes, minterms)
+            covered = lambda indices: all([any([row & primes[j][1] == primes[j][0] for j in indices])
+                                           for row in minterms])
+            self.assertTrue(covered(chosen), minterms)
+            smallest = next(size for size in range(len(primes) + 1)
+                            if any([covered(indices) for indices in itertools.combinations(range(len(primes)), size)]))
+            self.assertEqual(len(chosen), smallest, minterms)
+
+    def testSimplify(self):
+        self.assertEqual(BooleanAlgebra.simplify("AB+AB'"), "A")
+        self.assertEqual(BooleanAlgebra.simplify("A+A'"), "1")
+        self.assertEqual(BooleanAlgebra.simplify("AA'"), "0")
+        
+        rng = random.Random(12)
+        for inputChars,operators in [(list("ABCDE"), 25), (list("ABCDEFGHIJKL"), 40)]:
+            # Most of the statements over the second set use more than
+            # ExactMinimizeBits inputs, so they're minimized heuristically
+            for i in range(40):
+                statement = randomStatement(rng, inputChars, rng.randint(operators // 2, operators))
+                simplified = BooleanAlgebra.simplify(statement)
+                support = BooleanAlgebra.statementInputs(statement)
+                self.assertEqual(bruteForce(simplified, support) if simplified not in ("0", "1")
+                                 else [int(simplified)] * (1 << len(support)),
+                                 bruteForce(statement, support), statement)
+
+class GrayEvaluatorTest(unittest.TestCase):
+
+    def testSettingTheSameValue(self):
+        evaluator = BooleanAlgebra.GrayEvaluator(BooleanAlgebra.constructTree("A+B"))
+        self.assertEqual(evaluator.set("A", 0), 0)
+        
+        evaluator = BooleanAlgebra.GrayEvaluator(BooleanAlgebra.constructTree("AB"))
+        evaluator.set("A", 1)
+        evaluator.set("A", 1)
+        self.assertEqual(evaluator.set("B", 1), 1)
+        evaluator.set("B", 0)
+        evaluator.set("B", 0)
+        self.assertEqual(evaluator.set("B", 1), 1)
+
+    def testRandomSets(self):
+        rng = random.Random(0)
+        inputChars = list("ABCD")
+        for i in range(200):
+            statement = randomStatement(rng, inputChars, rng.randint(1, 12))
+            table = bruteForce(statement, inputChars)
+            evaluator = BooleanAlgebra.GrayEvaluator(BooleanAlgebra.constructTree(statement), inputChars)
+            values = [0] * len(inputChars)
+            for j in range(30):
+                # Any input to any value, including the one it has
+                index = rng.randrange(len(inputChars))
+                values[index] = rng.randint(0, 1)
+                result = evaluator.set(inputChars[index], values[index])
+                row = int("".join([str(val) for val in values]), 2)
+                self.assertEqual(result, table[row], statement)
+
+if __name__ == "__main__":
+    unittest.main()
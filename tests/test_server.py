@@ -0,0 +1,116 @@
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import BooleanAlgebra
+
+# Inputs of a compare job that keeps a worker busy for around a second
+SlowInputs = "ABCDEFGHIJKLMNOPQRST"
+
+# Line limit of the test server, well past asyncio's default of 64 KiB
+LineLimit = 1 << 20
+
+class ServerCase(unittest.TestCase):
+
+    '''
+    Runs startServer on a Unix socket in a background thread and talks to it
+    through request, with a single worker so jobs have to queue.
+    '''
+
+    # Seconds a job may run before the server gives up on it
+    Timeout = 30.0
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "server.sock")
+        self.pool = BooleanAlgebra.jobPool(1)
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(
+            BooleanAlgebra.startServer(path=self.path, workers=1, timeout=self.Timeout, pool=self.pool,
+                                      lineLimit=LineLimit))
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+        self.pool.shutdown()
+        self.directory.cleanup()
+
+    def request(self, jobs:list):
+        return BooleanAlgebra.request(jobs, path=self.path, timeout=60)
+
+    def requestBytes(self, data:bytes, count:int):
+        # Sends raw bytes and reads count result lines
+        with socket.socket(socket.AF_UNIX) as connection:
+            connection.settimeout(60)
+            connection.connect(self.path)
+            connection.sendall(data)
+            connection.shutdown(socket.SHUT_WR)
+            with connection.makefile("r") as stream:
+                return [json.loads(stream.readline()) for i in range(count)]
+
+class ServerTest(ServerCase):
+
+    def testResultsInOrder(self):
+        results = self.request([
+            {"op":"compare", "statement1":"AB+A'B", "statement2":"B"},
+            "A+B = B+A",
+            {"op":"eval", "statement":"AB", "inputs":{"A":1, "B":0}},
+            "A+(",
+        ])
+        self.assertEqual([result["line"] for result in results], [1, 2, 3, 4])
+        self.assertTrue(results[0]["equivalent"])
+        self.assertTrue(results[1]["equivalent"])
+        self.assertEqual(results[2]["result"], 0)
+        self.assertIn("error", results[3])
+
+    def testBadJobKeepsConnection(self):
+        results = self.request([{"op":"table", "statements":[]}, "A+B = B+A"])
+        self.assertEqual(len(results), 2)
+        self.assertIn("error", results[0])
+        self.assertTrue(results[1]["equivalent"])
+
+    def testLongLine(self):
+        # Expressions thousands of terms long don't fit asyncio's default limit
+        statement = "+".join(["AB"] * 30000)
+        results = self.request([{"op":"compare", "statement1":statement, "statement2":"AB"}, "A+B = B+A"])
+        self.assertTrue(results[0]["equivalent"])
+        self.assertTrue(results[1]["equivalent"])
+
+    def testLineOverLimit(self):
+        results = self.request(["+".join(["A"] * LineLimit), "A+B = B+A"])
+        self.assertEqual(len(results), 2)
+        self.assertIn("longer", results[0]["error"])
+        self.assertTrue(results[1]["equivalent"])
+
+    def testInvalidUTF8(self):
+        results = self.requestBytes(b"\xff\xfe=A\nA+B = B+A\n", 2)
+        self.assertIn("UnicodeDecodeError", results[0]["error"])
+        self.assertEqual(results[1]["line"], 2)
+        self.assertTrue(results[1]["equivalent"])
+
+class TimeoutTest(ServerCase):
+
+    Timeout = 0.5
+
+    def testTimeoutExcludesQueueing(self):
+        # The second job waits behind the slow one for longer than the timeout,
+        # only the time it spends running counts against it
+        slow = {"op":"compare", "statement1":SlowInputs + "+A", "statement2":"A+" + SlowInputs,
+                "strategy":"rows"}
+        results = self.request([slow, "A+B = B+A"])
+        self.assertIn("Timed out", results[0]["error"])
+        self.assertTrue(results[1]["equivalent"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import BooleanAlgebra
+
+class EvictedStore(BooleanAlgebra.TableStore):
+    # A store whose tables are evicted by another process as soon as they're written
+    def put(self, statement:str, inputChars:list, chunks):
+        super().put(statement, inputChars, chunks)
+        os.unlink(self.path(statement, inputChars))
+
+class TableStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check(self, store, statement:str):
+        inputChars = BooleanAlgebra.statementInputs(statement)
+        table = BooleanAlgebra.tableBits(BooleanAlgebra.constructTree(statement), inputChars)
+        packed = store.table(statement, inputChars)
+        self.assertEqual(int.from_bytes(packed, "little"), table)
+
+    def testTables(self):
+        store = BooleanAlgebra.TableStore(self.directory.name)
+        for statement in ["A", "AB+C'", "A^BCD+E'F", "ABCDEFGHIJKLMNOPQRSTU+A'C"]:
+            self.check(store, statement)
+            self.check(store, statement)
+        self.assertEqual(store.hits, 4)
+
+    def testEvictedBeforeReadBack(self):
+        store = EvictedStore(self.directory.name)
+        for statement in ["A", "AB+C'", "ABCDEFGHIJKLMNOPQRSTU+A'C"]:
+            self.check(store, statement)
+        self.assertEqual(store.hits, 0)
+
+if __name__ == "__main__":
+    unittest.main()